@@ -15,7 +15,7 @@ Objectif : S'assurer que les données sont suffisamment diversifiées
 pour permettre un apprentissage machine efficace.
 
 Usage:
-    python src/audit_winner.py
+    python src/audit_winner.py [--data master_ml.csv] [--output reports/checks]
     
 Sorties:
     - Rapport console détaillé
@@ -25,19 +25,23 @@ Auteur: Équipe MSPR Nantes
 Date: 2024-2025
 """
 
+import argparse
 import pandas as pd
 import numpy as np
 import os
 import sys
 from pathlib import Path
 
-def load_dataset():
+def load_dataset(data_path=None):
     """
     Charge le dataset master avec une stratégie de chemins multiples.
     
     Teste plusieurs emplacements possibles pour le fichier master_ml.csv
     afin d'assurer la compatibilité Docker et locale.
     
+    Args:
+        data_path (str, optional): Chemin explicite, essayé en premier
+    
     Returns:
         pd.DataFrame: Dataset chargé
         
@@ -50,6 +54,8 @@ def load_dataset():
         'data/processed_csv/master_ml.csv',       # Chemin local relatif
         'src/../data/processed_csv/master_ml.csv'  # Chemin alternatif
     ]
+    if data_path:
+        possible_paths.insert(0, data_path)
     
     for path in possible_paths:
         try:
@@ -98,8 +104,14 @@ def check_required_columns(df):
     
     return True
 
+# Arguments (optionnels) : source et répertoire de sortie
+parser = argparse.ArgumentParser(description="Audit de cohérence des vainqueurs par commune")
+parser.add_argument("--data", default=None, help="Chemin vers master_ml.csv (sinon emplacements usuels)")
+parser.add_argument("--output", default="/app/reports/checks", help="Répertoire du fichier d'audit")
+args = parser.parse_args()
+
 # Chargement principal du dataset
-df = load_dataset()
+df = load_dataset(args.data)
 
 # Vérification de l'intégrité des colonnes
 columns_ok = check_required_columns(df)
@@ -191,9 +203,10 @@ else:
 
 # 6. Save results
 try:
-    os.makedirs('/app/reports/checks', exist_ok=True)
-    results_df.to_csv('/app/reports/checks/winner_variation.csv', index=False)
-    print(f'\n6. Results saved to: /app/reports/checks/winner_variation.csv')
+    audit_path = os.path.join(args.output, 'winner_variation.csv')
+    os.makedirs(args.output, exist_ok=True)
+    results_df.to_csv(audit_path, index=False)
+    print(f'\n6. Results saved to: {audit_path}')
 except:
     try:
         os.makedirs('reports/checks', exist_ok=True)
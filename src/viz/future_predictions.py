@@ -64,6 +64,7 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import joblib
+from joblib import Parallel, delayed
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -71,6 +72,12 @@ from pathlib import Path
 plt.switch_backend('Agg')
 plt.style.use('default')
 
+# Types de scrutin projetés pour chaque année cible
+SCRUTINS = ('presidentielle', 'legislative', 'europeenne', 'municipale')
+
+# Figures réutilisées d'un appel à l'autre, indexées par (nrows, ncols, figsize)
+_FIG_CACHE = {}
+
 def setup_matplotlib():
     """Configure matplotlib pour un rendu optimal"""
     plt.rcParams.update({
@@ -82,12 +89,28 @@ def setup_matplotlib():
         'ytick.labelsize': 11,
         'legend.fontsize': 11,
         'figure.dpi': 150,
-        'savefig.dpi': 300,
+        'savefig.dpi': 120,
         'savefig.bbox': 'tight',
         'axes.grid': True,
         'grid.alpha': 0.3
     })
 
+def _get_figure(nrows, ncols, figsize):
+    """Retourne une figure en cache (axes vidés) pour éviter de recréer le canvas"""
+    key = (nrows, ncols, figsize)
+    if key not in _FIG_CACHE:
+        _FIG_CACHE[key] = plt.subplots(nrows, ncols, figsize=figsize)
+    fig, axes = _FIG_CACHE[key]
+    for ax in fig.axes:
+        ax.clear()
+    return fig, axes
+
+def release_figures():
+    """Ferme les figures en cache (à appeler une fois les graphiques terminés)"""
+    for fig, _ in _FIG_CACHE.values():
+        plt.close(fig)
+    _FIG_CACHE.clear()
+
 def load_model_and_data(model_path, data_path):
     """
     Charge le modèle entraîné et les données historiques pour les prédictions.
@@ -129,7 +152,8 @@ def load_model_and_data(model_path, data_path):
     
     # Chargement des données historiques
     try:
-        df = pd.read_csv(data_path)
+        # .feather : fichier Arrow partagé préparé par run_all_visualizations
+        df = pd.read_feather(data_path) if data_path.endswith('.feather') else pd.read_csv(data_path)
         df['annee'] = pd.to_numeric(df['annee'], errors='coerce')
         print(f"✅ Données chargées : {len(df)} observations")
     except FileNotFoundError:
@@ -138,81 +162,126 @@ def load_model_and_data(model_path, data_path):
     
     return model, df
 
-def generate_future_scenarios(df, target_years=[2025, 2026, 2027]):
-    """Génère des scenarios prospectifs basés sur les tendances historiques"""
+def _slope(x, y):
+    """Pente de la droite des moindres carrés (forme fermée, degré 1)"""
+    dx = x - x.mean()
+    denom = (dx * dx).sum()
+    if denom == 0:
+        return 0.0
+    return (dx * (y - y.mean())).sum() / denom
+
+def _row_percentages(counts):
+    """Normalise chaque ligne d'un tableau de comptages en pourcentages"""
+    vals = counts.to_numpy(dtype=float)
+    pct_vals = vals * (100.0 / vals.sum(axis=1, keepdims=True))
+    return pd.DataFrame(pct_vals, index=counts.index, columns=counts.columns)
+
+def _process_commune(commune, commune_data, target_years, default_template):
+    """Construit les lignes de scénarios prospectifs d'une commune"""
+    rows = []
+    commune_name = commune_data['nom_commune'].iloc[0] if len(commune_data) > 0 else f"Commune_{commune}"
+    
+    # Calcul des tendances moyennes pour les indicateurs socio-économiques
+    socio_cols = ['population', 'revenu_median_uc_euros', 'taux_chomage_pct', 
+                 'taux_pauvrete_pct', 'delinquance_pour_1000_hab']
+    available_cols = [col for col in socio_cols if col in commune_data.columns]
+    
+    # Projection des indicateurs socio-économiques, calculée une fois par commune :
+    # {col: (dernière année, dernière valeur, pente)} ou valeur constante
+    # Utilise la tendance linéaire des 3 dernières années disponibles
+    trends = {}
+    for col in available_cols:
+        if commune_data[col].notna().sum() > 0:
+            recent_data = commune_data.dropna(subset=[col]).tail(3)
+            if len(recent_data) >= 2:
+                # Régression linéaire simple
+                years = recent_data['annee'].values.astype(float)
+                values = recent_data[col].values.astype(float)
+                trends[col] = (years[-1], values[-1], _slope(years, values))
+            else:
+                # Utilise la moyenne si pas assez de données
+                trends[col] = commune_data[col].mean()
+        else:
+            trends[col] = np.nan
+    
+    # Participation moyenne par type de scrutin présent dans l'historique de la commune
+    turnout_by_scrutin = None
+    if 'turnout_pct' in commune_data.columns:
+        turnout_by_scrutin = {}
+        for scrutin in SCRUTINS:
+            recent_turnout = commune_data.loc[commune_data['type_scrutin'] == scrutin, 'turnout_pct']
+            if len(recent_turnout) > 0:
+                turnout_by_scrutin[scrutin] = recent_turnout.mean()
+    
+    for target_year in target_years:
+        for scrutin in SCRUTINS:
+            for tour in [1, 2]:
+                # Skip tour 2 pour certains scrutins
+                if scrutin in ['europeenne', 'municipale'] and tour == 2:
+                    continue
+                
+                base_row = {
+                    'code_commune_insee': commune,
+                    'nom_commune': commune_name,
+                    'annee': target_year,
+                    'type_scrutin': scrutin,
+                    'tour': tour,
+                    'date_scrutin': f"{target_year}-01-01",  # Date fictive
+                }
+                
+                for col, trend in trends.items():
+                    if isinstance(trend, tuple):
+                        last_year, last_value, slope = trend
+                        base_row[col] = last_value + slope * (target_year - last_year)
+                    else:
+                        base_row[col] = trend
+                
+                # Estimation de la participation basée sur les tendances
+                if turnout_by_scrutin is not None:
+                    if scrutin in turnout_by_scrutin:
+                        # Légère diminution de la participation (tendance observée)
+                        base_row['turnout_pct'] = turnout_by_scrutin[scrutin] * 0.98
+                    else:
+                        base_row['turnout_pct'] = 0.65  # Valeur par défaut
+                
+                # Ajout de colonnes manquantes avec des valeurs par défaut, après
+                # celles de base_row (ordre des colonnes du CSV de prédictions)
+                rows.append({**base_row, **{col: value for col, value in default_template.items()
+                                            if col not in base_row}})
+    
+    return rows
+
+def generate_future_scenarios(df, target_years=[2025, 2026, 2027], n_jobs=1):
+    """
+    Génère des scenarios prospectifs basés sur les tendances historiques.
+    
+    n_jobs > 1 (ou -1) répartit les communes sur plusieurs processus ; pour
+    quelques dizaines de communes, le démarrage des processus coûte plus que
+    le calcul, d'où le traitement séquentiel par défaut.
+    """
     print("🔮 Génération des scénarios prospectifs")
     
-    # Analyse des tendances historiques par commune
-    future_data = []
+    # Valeurs par défaut des colonnes non projetées, calculées une seule fois
+    default_template = {
+        col: (0.0 if 'pct' in col or col.startswith('voix_')
+              else 1000 if col in ['inscrits', 'votants', 'exprimes']  # Valeur fictive
+              else np.nan)
+        for col in df.columns
+    }
     
-    for commune in df['code_commune_insee'].unique():
-        commune_data = df[df['code_commune_insee'] == commune].copy()
-        commune_name = commune_data['nom_commune'].iloc[0] if len(commune_data) > 0 else f"Commune_{commune}"
-        
-        # Calcul des tendances moyennes pour les indicateurs socio-économiques
-        socio_cols = ['population', 'revenu_median_uc_euros', 'taux_chomage_pct', 
-                     'taux_pauvrete_pct', 'delinquance_pour_1000_hab']
-        available_cols = [col for col in socio_cols if col in commune_data.columns]
-        
-        for target_year in target_years:
-            for scrutin in ['presidentielle', 'legislative', 'europeenne', 'municipale']:
-                for tour in [1, 2]:
-                    # Skip tour 2 pour certains scrutins
-                    if scrutin in ['europeenne', 'municipale'] and tour == 2:
-                        continue
-                    
-                    base_row = {
-                        'code_commune_insee': commune,
-                        'nom_commune': commune_name,
-                        'annee': target_year,
-                        'type_scrutin': scrutin,
-                        'tour': tour,
-                        'date_scrutin': f"{target_year}-01-01",  # Date fictive
-                    }
-                    
-                    # Projection des indicateurs socio-économiques
-                    # Utilise la tendance linéaire des 3 dernières années disponibles
-                    for col in available_cols:
-                        if col in commune_data.columns and commune_data[col].notna().sum() > 0:
-                            # Calcul de la tendance
-                            recent_data = commune_data.dropna(subset=[col]).tail(3)
-                            if len(recent_data) >= 2:
-                                # Régression linéaire simple
-                                years = recent_data['annee'].values
-                                values = recent_data[col].values
-                                slope = np.polyfit(years, values, 1)[0]
-                                last_year = years[-1]
-                                last_value = values[-1]
-                                
-                                # Projection
-                                projected_value = last_value + slope * (target_year - last_year)
-                                base_row[col] = projected_value
-                            else:
-                                # Utilise la moyenne si pas assez de données
-                                base_row[col] = commune_data[col].mean()
-                        else:
-                            base_row[col] = np.nan
-                    
-                    # Estimation de la participation basée sur les tendances
-                    if 'turnout_pct' in commune_data.columns:
-                        recent_turnout = commune_data[commune_data['type_scrutin'] == scrutin]['turnout_pct']
-                        if len(recent_turnout) > 0:
-                            # Légère diminution de la participation (tendance observée)
-                            base_row['turnout_pct'] = recent_turnout.mean() * 0.98
-                        else:
-                            base_row['turnout_pct'] = 0.65  # Valeur par défaut
-                    
-                    # Ajout de colonnes manquantes avec des valeurs par défaut
-                    for col in df.columns:
-                        if col not in base_row:
-                            if 'pct' in col or col.startswith('voix_'):
-                                base_row[col] = 0.0
-                            elif col in ['inscrits', 'votants', 'exprimes']:
-                                base_row[col] = 1000  # Valeur fictive
-                            else:
-                                base_row[col] = np.nan
-                    
-                    future_data.append(base_row)
+    # Analyse des tendances historiques par commune (un seul partitionnement du DataFrame)
+    commune_groups = dict(tuple(df.groupby('code_commune_insee', sort=False)))
+    
+    if n_jobs == 1:
+        results = [_process_commune(commune, commune_data, target_years, default_template)
+                   for commune, commune_data in commune_groups.items()]
+    else:
+        # Les communes sont indépendantes : traitement réparti sur plusieurs processus
+        results = Parallel(n_jobs=n_jobs, backend='loky')(
+            delayed(_process_commune)(commune, commune_data, target_years, default_template)
+            for commune, commune_data in commune_groups.items()
+        )
+    future_data = [row for rows in results for row in rows]
     
     future_df = pd.DataFrame(future_data)
     print(f"✅ {len(future_df)} scénarios prospectifs générés")
@@ -223,17 +292,22 @@ def make_predictions(model, future_df, original_df):
     print("🎯 Génération des prédictions")
     
     # Préparation des données (même preprocessing que l'entraînement)
-    # Sélection des colonnes numériques et catégorielles utilisées à l'entraînement
-    exclude = set(["code_commune_insee", "nom_commune", "code_epci", "date_scrutin",
-                   "winner_prev", "estime", "parti_en_tete", "famille_politique"])
-    
     categorical = ['type_scrutin', 'tour']
-    numeric = [c for c in future_df.columns 
-              if c not in exclude and c not in categorical and pd.api.types.is_numeric_dtype(future_df[c])]
+    
+    if hasattr(model, 'feature_names_in_'):
+        # Colonnes et ordre mémorisés par le modèle lors de l'entraînement
+        features = list(model.feature_names_in_)
+        numeric = [c for c in features if c not in categorical]
+    else:
+        # Sélection des colonnes numériques et catégorielles utilisées à l'entraînement
+        exclude = set(["code_commune_insee", "nom_commune", "code_epci", "date_scrutin",
+                       "winner_prev", "estime", "parti_en_tete", "famille_politique"])
+        numeric = [c for c in future_df.columns 
+                  if c not in exclude and c not in categorical and pd.api.types.is_numeric_dtype(future_df[c])]
+        features = numeric + categorical
     
     # Préparation des features pour prédiction
-    features = numeric + categorical
-    X_future = future_df[features].copy()
+    X_future = future_df.reindex(columns=features)
     
     # Gestion des valeurs manquantes (même stratégie qu'à l'entraînement)
     for col in numeric:
@@ -264,18 +338,23 @@ def make_predictions(model, future_df, original_df):
         return future_df
 
 def visualize_future_trends(predicted_df, output_dir):
-    """Crée les visualisations des tendances futures"""
+    """
+    Crée les visualisations des tendances futures.
+    
+    La figure reste en cache pour les appels suivants : les appelants qui
+    importent cette fonction libèrent la mémoire avec release_figures().
+    """
     print("📈 Génération des visualisations prospectives")
     
     setup_matplotlib()
     
     # 1. Évolution des prédictions par année
-    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    fig, axes = _get_figure(2, 2, (16, 12))
     
     # Graphique 1 : Distribution des partis prédits par année
     ax1 = axes[0, 0]
     yearly_predictions = predicted_df.groupby(['annee', 'predicted_parti']).size().unstack(fill_value=0)
-    yearly_pct = yearly_predictions.div(yearly_predictions.sum(axis=1), axis=0) * 100
+    yearly_pct = _row_percentages(yearly_predictions)
     
     yearly_pct.plot(kind='bar', ax=ax1, stacked=True)
     ax1.set_title('Évolution Prédite des Familles Politiques (2025-2027)')
@@ -287,7 +366,7 @@ def visualize_future_trends(predicted_df, output_dir):
     # Graphique 2 : Comparaison par type de scrutin
     ax2 = axes[0, 1]
     scrutin_predictions = predicted_df.groupby(['type_scrutin', 'predicted_parti']).size().unstack(fill_value=0)
-    scrutin_pct = scrutin_predictions.div(scrutin_predictions.sum(axis=1), axis=0) * 100
+    scrutin_pct = _row_percentages(scrutin_predictions)
     
     scrutin_pct.plot(kind='bar', ax=ax2)
     ax2.set_title('Prédictions par Type de Scrutin')
@@ -331,10 +410,9 @@ def visualize_future_trends(predicted_df, output_dir):
                 ha='center', va='center', transform=ax4.transAxes)
         ax4.set_title('Incertitude des Prédictions')
     
-    plt.tight_layout()
+    fig.tight_layout()
     output_path = os.path.join(output_dir, 'predictions_futures_2025-2027.png')
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    plt.close()
+    fig.savefig(output_path, dpi=120, bbox_inches='tight')
     
     # 2. Carte de prédictions pour 2025 (présidentielle)
     create_prediction_summary_table(predicted_df, output_dir)
@@ -347,7 +425,7 @@ def create_prediction_summary_table(predicted_df, output_dir):
     
     # Synthèse par année et scrutin
     summary = predicted_df.groupby(['annee', 'type_scrutin', 'predicted_parti']).size().unstack(fill_value=0)
-    summary_pct = summary.div(summary.sum(axis=1), axis=0) * 100
+    summary_pct = _row_percentages(summary)
     
     # Sauvegarde CSV
     summary_path = os.path.join(output_dir, 'predictions_summary.csv')
@@ -390,6 +468,8 @@ def main():
                        help="Répertoire de sortie pour les prédictions")
     parser.add_argument("--years", nargs="+", type=int, default=[2025, 2026, 2027],
                        help="Années à prédire")
+    parser.add_argument("--jobs", type=int, default=1,
+                       help="Nombre de processus pour les scénarios par commune (-1 = tous les cœurs, 1 par défaut)")
     
     args = parser.parse_args()
     
@@ -401,7 +481,7 @@ def main():
     model, historical_df = load_model_and_data(args.model, args.data)
     
     # Génération des scénarios futurs
-    future_scenarios = generate_future_scenarios(historical_df, args.years)
+    future_scenarios = generate_future_scenarios(historical_df, args.years, n_jobs=args.jobs)
     
     # Prédictions
     predictions_df = make_predictions(model, future_scenarios, historical_df)
@@ -413,6 +493,7 @@ def main():
     
     # Visualisations
     chart_path = visualize_future_trends(predictions_df, args.output)
+    release_figures()
     
     print(f"\n✅ Prédictions futures terminées!")
     print(f"🎯 Années analysées : {', '.join(map(str, args.years))}")
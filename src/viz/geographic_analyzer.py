@@ -35,7 +35,7 @@ Fonctionnalités principales:
 Architecture cartographique:
     - Données GeoJSON officielles des communes (IGN/INSEE)
     - Projection Lambert-93 pour précision géographique  
-    - Rendu haute résolution (300 DPI) pour publication
+    - Rendu 150 DPI par défaut (option --dpi, ex. 300 pour publication)
     - Export PNG avec métadonnées complètes
 
 Métriques calculées:
@@ -48,7 +48,8 @@ Usage:
 
 Dépendances géographiques:
     - Fichier GeoJSON des communes (src/etl/fetch_geojson.py)
-    - Matplotlib avec support cartographique
+    - Matplotlib uniquement : les communes sont dessinées en une seule
+      PolyCollection à partir de tableaux numpy (ni shapely ni geopandas)
     - Correspondance codes INSEE/noms communes
 
 Auteur: Équipe MSPR Nantes
@@ -59,15 +60,91 @@ import argparse
 import os
 import sys
 import json
+import pickle
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Rendu PNG sans interface graphique (serveur/Docker)
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 from matplotlib.colors import LinearSegmentedColormap, Normalize
+from matplotlib.collections import PolyCollection
 import matplotlib.cm as cm
+from joblib import Parallel, delayed, effective_n_jobs
 from pathlib import Path
 
-def load_data(data_path, geojson_path):
+from src.viz.geometry_kernels import HAS_NUMBA, point_in_ring, ring_areas as ring_areas_kernel
+
+try:
+    # Lecteur CSV multithread (optionnel) : sinon moteur C de pandas
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+try:
+    # Parseur JSON natif (optionnel) : le plus rapide pour lire le GeoJSON d'un bloc
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # Parseur JSON en flux (optionnel) : les features sont lues une à une
+    import ijson
+except ImportError:
+    ijson = None
+
+# Simplification des tracés au rendu : les sommets quasi alignés (écart < 1 pixel) sont ignorés
+plt.rcParams['path.simplify'] = True
+plt.rcParams['path.simplify_threshold'] = 1.0
+
+# Seules colonnes de master_ml.csv utilisées par les cartes et l'analyse de stabilité
+DATA_COLUMNS = ['annee', 'famille_politique', 'code_commune_insee', 'nom_commune',
+                'type_scrutin', 'tour', 'turnout_pct']
+DATA_DTYPES = {'code_commune_insee': 'string[pyarrow]' if pa is not None else 'string',
+               'famille_politique': 'category', 'type_scrutin': 'category'}
+
+# Couleurs des familles politiques (construites une fois pour toutes les cartes)
+_PARTY_COLOR_MAP = {
+    'PS': '#FF6B9D',      # Rose
+    'LR': '#4A90E2',      # Bleu
+    'RE': '#F5A623',      # Orange/Jaune
+    'LREM': '#F5A623',    # Orange/Jaune (alias RE)
+    'RN': '#8B4513',      # Marron foncé
+    'FN': '#8B4513',      # Marron foncé (alias RN)
+    'LFI': '#D0021B',     # Rouge
+    'EELV': '#7ED321',    # Vert
+    'MODEM': '#BD10E0',   # Violet
+    'PCF': '#D0021B',     # Rouge communiste
+    'DVG': '#FF1744',     # Rouge gauche
+    'DVD': '#1976D2',     # Bleu droite
+    'DIV': '#9E9E9E',     # Gris divers
+    'EXG': '#B71C1C',     # Rouge extrême
+    'EXD': '#3E2723',     # Marron extrême droite
+}
+
+# Tolérance Douglas–Peucker en degrés (~10 m, moins d'un pixel sur les cartes exportées)
+SIMPLIFY_TOLERANCE = 1e-4
+# Taille de GeoJSON (octets) à partir de laquelle il est lu en flux avec ijson plutôt que d'un bloc
+GEOJSON_STREAM_MIN_BYTES = 64 * 1024 * 1024
+
+# Figures de carte réutilisées d'une élection à l'autre, indexées par (type de carte, codes des communes)
+_MAP_CACHE = {}
+
+def _cache_file(cache_dir, prefix, source_path, ext):
+    """Chemin du cache d'un résultat dérivé de source_path, invalidé par sa date de modification et sa taille"""
+    stat = os.stat(source_path)
+    return os.path.join(cache_dir, f'{prefix}_{stat.st_mtime_ns}_{stat.st_size}.{ext}')
+
+def _store_cache(cache_path, save):
+    """Écrit un cache via save(chemin) après suppression des versions périmées du même préfixe"""
+    cache_dir, name = os.path.split(cache_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    for stale in Path(cache_dir).glob(f"{name.split('_', 1)[0]}_*"):
+        if stale.name != name:
+            stale.unlink()
+    save(cache_path)
+
+def load_data(data_path, geojson_path, cache_dir=None):
     """
     Charge et synchronise les données électorales avec les géométries communales.
     
@@ -81,174 +158,324 @@ def load_data(data_path, geojson_path):
     Args:
         data_path (str): Chemin vers le fichier master_ml.csv
         geojson_path (str): Chemin vers le fichier GeoJSON des communes
+        cache_dir (str, optional): Répertoire du cache des géométries préparées
         
     Returns:
-        tuple: (df_clean, geojson_data, communes_map)
+        tuple: (df_clean, geometry)
             - df_clean: DataFrame électoral nettoyé
-            - geojson_data: Données géométriques JSON
-            - communes_map: Dictionnaire code_insee -> nom_commune
+            - geometry: Géométries préparées (voir prepare_geometry)
             
     Raises:
         SystemExit: Si les fichiers sont manquants ou incompatibles
         
     Note:
         Le GeoJSON doit être généré via src/etl/fetch_geojson.py avant
-        l'utilisation de ce module.
+        l'utilisation de ce module. Seules les colonnes DATA_COLUMNS du CSV
+        sont lues (moteur pyarrow si disponible). Un GeoJSON d'au moins
+        GEOJSON_STREAM_MIN_BYTES est lu en flux avec ijson (l'arbre JSON complet
+        n'est alors jamais matérialisé en mémoire) ; sinon avec orjson s'il est
+        installé, sinon avec json. Avec cache_dir,
+        les géométries préparées sont conservées en pickle et relues tant que
+        le GeoJSON (date de modification, taille) n'a pas changé.
     """
     print(f"📂 Chargement des données depuis {data_path}")
     
     try:
-        df = pd.read_csv(data_path)
+        if data_path.endswith('.feather'):
+            # Fichier Arrow partagé préparé par run_all_visualizations : lecture en colonnes
+            df = pd.read_feather(data_path, columns=DATA_COLUMNS).astype(DATA_DTYPES)
+        else:
+            df = pd.read_csv(data_path, engine='pyarrow' if pa is not None else 'c',
+                             usecols=DATA_COLUMNS, dtype=DATA_DTYPES)
     except FileNotFoundError:
         print(f"❌ Fichier de données non trouvé: {data_path}")
         sys.exit(1)
     
     print(f"📍 Chargement du GeoJSON depuis {geojson_path}")
     try:
-        with open(geojson_path, 'r', encoding='utf-8') as f:
-            geojson_data = json.load(f)
+        geometry_cache = None
+        if cache_dir:
+            geometry_cache = _cache_file(cache_dir, 'geom', geojson_path, f'soa_{SIMPLIFY_TOLERANCE:g}.pkl')
+        
+        if geometry_cache and os.path.exists(geometry_cache):
+            with open(geometry_cache, 'rb') as f:
+                geometry = pickle.load(f)
+            print(f"⚡ Géométries relues depuis le cache: {geometry_cache}")
+        else:
+            if ijson is not None and os.path.getsize(geojson_path) >= GEOJSON_STREAM_MIN_BYTES:
+                # Gros fichier : features lues une à une, l'arbre JSON n'est jamais complet en mémoire
+                with open(geojson_path, 'rb') as f:
+                    geometry = prepare_geometry(ijson.items(f, 'features.item', use_float=True))
+            elif orjson is not None:
+                with open(geojson_path, 'rb') as f:
+                    geometry = prepare_geometry(orjson.loads(f.read())['features'])
+            else:
+                with open(geojson_path, 'r', encoding='utf-8') as f:
+                    geometry = prepare_geometry(json.load(f)['features'])
+            
+            if geometry_cache:
+                def save_geometry(path):
+                    with open(path, 'wb') as f:
+                        pickle.dump(geometry, f, protocol=pickle.HIGHEST_PROTOCOL)
+                _store_cache(geometry_cache, save_geometry)
     except FileNotFoundError:
         print(f"❌ Fichier GeoJSON non trouvé: {geojson_path}")
         print("💡 Lancez d'abord: docker compose run --rm app python src/etl/fetch_geojson.py")
         sys.exit(1)
     
     # Nettoyage des données
-    df['annee'] = pd.to_numeric(df['annee'], errors='coerce')
+    df['annee'] = pd.to_numeric(df['annee'], errors='coerce', downcast='integer')
     df = df.dropna(subset=['annee', 'famille_politique', 'code_commune_insee'])
-    df['code_commune_insee'] = df['code_commune_insee'].astype(str).str.zfill(5)
+    # Colonne Arrow : le remplissage à 5 caractères passe par un noyau de calcul pyarrow
+    df['code_commune_insee'] = df['code_commune_insee'].str.pad(5, side='left', fillchar='0')
     
-    print(f"✅ Données chargées: {len(df)} lignes électorales, {len(geojson_data['features'])} communes GeoJSON")
-    return df, geojson_data
+    print(f"✅ Données chargées: {len(df)} lignes électorales, {len(geometry[0])} communes GeoJSON")
+    return df, geometry
 
 def create_party_color_map():
-    """Crée une carte de couleurs pour les familles politiques"""
-    colors = {
-        'PS': '#FF6B9D',      # Rose
-        'LR': '#4A90E2',      # Bleu
-        'RE': '#F5A623',      # Orange/Jaune
-        'LREM': '#F5A623',    # Orange/Jaune (alias RE)
-        'RN': '#8B4513',      # Marron foncé
-        'FN': '#8B4513',      # Marron foncé (alias RN)
-        'LFI': '#D0021B',     # Rouge
-        'EELV': '#7ED321',    # Vert
-        'MODEM': '#BD10E0',   # Violet
-        'PCF': '#D0021B',     # Rouge communiste
-        'DVG': '#FF1744',     # Rouge gauche
-        'DVD': '#1976D2',     # Bleu droite
-        'DIV': '#9E9E9E',     # Gris divers
-        'EXG': '#B71C1C',     # Rouge extrême
-        'EXD': '#3E2723',     # Marron extrême droite
-    }
-    return colors
-
-def analyze_geographic_trends(df, output_dir):
-    """Analyse des tendances géographiques"""
-    print("🗺️  Analyse des tendances géographiques")
+    """Carte de couleurs des familles politiques (constante du module, à ne pas modifier)"""
+    return _PARTY_COLOR_MAP
+
+def simplify_ring(ring, tolerance):
+    """
+    Simplifie un anneau par l'algorithme de Douglas–Peucker (numpy, pile explicite).
     
-    # 1. Stabilité/volatilité par commune
-    stability_analysis = []
+    Les extrémités sont toujours conservées ; si moins de 4 sommets subsistent,
+    l'anneau d'origine est renvoyé pour rester un polygone valide.
+    """
+    if tolerance <= 0 or len(ring) <= 4:
+        return ring
+    
+    keep = np.zeros(len(ring), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(ring) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        offsets = ring[start + 1:end] - ring[start]
+        direction = ring[end] - ring[start]
+        length = np.hypot(direction[0], direction[1])
+        if length == 0:
+            # Anneau fermé : distance au point de départ
+            dist = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            dist = np.abs(direction[0] * offsets[:, 1] - direction[1] * offsets[:, 0]) / length
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            split = start + 1 + i
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    
+    simplified = ring[keep]
+    return simplified if len(simplified) >= 4 else ring
+
+def prepare_geometry(features, tolerance=SIMPLIFY_TOLERANCE):
+    """
+    Pré-calcule une seule fois les géométries des communes pour toutes les cartes.
     
-    for commune in df['code_commune_insee'].unique():
-        commune_data = df[df['code_commune_insee'] == commune]
+    Args:
+        features (iterable): Features GeoJSON des communes (liste ou flux ijson)
+        tolerance (float): Tolérance de simplification Douglas–Peucker (0 = géométrie brute)
         
-        if len(commune_data) > 1:
-            # Calcul de la diversité des partis gagnants
-            unique_winners = commune_data['famille_politique'].nunique()
-            total_elections = len(commune_data)
-            volatility = unique_winners / total_elections
-            
-            # Parti le plus fréquent
-            most_frequent = commune_data['famille_politique'].mode().iloc[0]
-            frequency = (commune_data['famille_politique'] == most_frequent).sum() / total_elections
-            
-            stability_analysis.append({
-                'code_commune_insee': commune,
-                'nom_commune': commune_data['nom_commune'].iloc[0],
-                'volatilite': volatility,
-                'parti_dominant': most_frequent,
-                'dominance_pct': frequency * 100,
-                'nb_elections': total_elections
-            })
+    Returns:
+        tuple: (codes, coords, offsets, bounds)
+            - codes: np.ndarray des codes INSEE (5 caractères), dans l'ordre des features
+            - coords: np.ndarray float32 (somme des sommets, 2) des anneaux extérieurs mis bout à bout
+            - offsets: np.ndarray (nb_communes + 1,) ; l'anneau i est coords[offsets[i]:offsets[i + 1]]
+            - bounds: Emprise (xmin, ymin, xmax, ymax) de l'ensemble des communes
+    """
+    codes = []
+    verts = []
+    for feature in features:
+        if feature['geometry']['type'] == 'Polygon':
+            coords = feature['geometry']['coordinates'][0]
+        elif feature['geometry']['type'] == 'MultiPolygon':
+            # Pour les MultiPolygons, prendre le premier polygone
+            coords = feature['geometry']['coordinates'][0][0]
+        else:
+            continue
+        codes.append(feature['properties'].get('code', '').zfill(5))
+        # Conversion numpy en un appel ; seules les colonnes x, y sont conservées
+        # (les coordonnées GeoJSON peuvent porter une altitude), puis simplification
+        verts.append(simplify_ring(np.asarray(coords, dtype=np.float64)[:, :2], tolerance))
+    
+    if not verts:
+        # Aucune commune exploitable : cartes vides (emprise par défaut de matplotlib)
+        return np.array(codes, dtype=str), np.empty((0, 2), np.float32), np.zeros(1, np.int64), (0.0, 0.0, 1.0, 1.0)
+    
+    # Stockage à plat (float32, précision largement suffisante pour l'affichage)
+    coords = np.concatenate(verts).astype(np.float32)
+    offsets = np.cumsum([0] + [len(v) for v in verts])
+    bounds = (*coords.min(axis=0), *coords.max(axis=0))
+    return np.array(codes), coords, offsets, bounds
+
+def ring_views(geometry):
+    """Anneaux sous forme de vues (N, 2) sur le tableau à plat, pour PolyCollection"""
+    _, coords, offsets, _ = geometry
+    return np.split(coords, offsets[1:-1]) if len(offsets) > 1 else []
+
+def ring_centroids(geometry):
+    """Moyenne des sommets de chaque anneau, en une passe vectorisée"""
+    _, coords, offsets, _ = geometry
+    return np.add.reduceat(coords.astype(np.float64), offsets[:-1]) / np.diff(offsets)[:, None]
+
+def build_color_lut(categories, color_map):
+    """Tableau des couleurs indexé par les codes de la catégorie famille_politique"""
+    return np.array([color_map.get(parti, '#CCCCCC') for parti in categories])  # Gris par défaut
+
+def _party_colors(election_data, geometry, color_lut):
+    """
+    Couleur de chaque feature GeoJSON pour une élection.
     
-    stability_df = pd.DataFrame(stability_analysis)
+    famille_politique doit être de type category : les lignes sont réindexées
+    sur les codes des features, puis la couleur est obtenue par indexation
+    entière de color_lut (code -1 = commune sans données).
+    
+    Returns:
+        tuple: (partis présents sur la carte, couleurs par feature)
+    """
+    codes = geometry[0]
+    party = election_data.set_index('code_commune_insee')['famille_politique'].reindex(codes)
+    party_codes = party.cat.codes.to_numpy()
+    colors = np.where(party_codes >= 0, color_lut[party_codes], '#F0F0F0')  # Gris clair pour les communes sans données
+    
+    return set(party.dropna()), colors
+
+def ring_areas(geometry):
+    """Aire de chaque anneau (formule du lacet), dans l'unité des coordonnées"""
+    _, coords, offsets, bounds = geometry
+    if HAS_NUMBA:
+        return ring_areas_kernel(coords, offsets)
+    
+    # float64 et origine ramenée au coin de l'emprise pour limiter les erreurs d'arrondi
+    xy = coords.astype(np.float64) - np.array(bounds[:2])
+    following = np.arange(1, len(xy) + 1)
+    following[offsets[1:] - 1] = offsets[:-1]  # Le dernier sommet d'un anneau rejoint le premier
+    cross = xy[:, 0] * xy[following, 1] - xy[following, 0] * xy[:, 1]
+    return 0.5 * np.abs(np.add.reduceat(cross, offsets[:-1]))
+
+def analyze_geographic_trends(df, output_dir, cache_path=None):
+    """Analyse des tendances géographiques (cache_path : parquet réutilisé s'il existe)"""
+    print("🗺️  Analyse des tendances géographiques")
     
-    # Sauvegarde de l'analyse
     stability_path = os.path.join(output_dir, 'analyse_stabilite_communes.csv')
+    if cache_path and os.path.exists(cache_path):
+        stability_df = pd.read_parquet(cache_path)
+        stability_df.to_csv(stability_path, index=False)
+        print(f"📊 Analyse de stabilité (cache) sauvegardée: {stability_path}")
+        return stability_df
+    
+    # 1. Stabilité/volatilité par commune (agrégations groupby en une passe)
+    g = df.groupby('code_commune_insee', sort=False)
+    total_elections = g.size()
+    
+    # Parti le plus fréquent (à égalité, le premier par ordre alphabétique comme mode())
+    party_counts = df.groupby(['code_commune_insee', 'famille_politique'], observed=True).size()
+    dominant = party_counts.groupby(level=0).idxmax().str[1]
+    dominant_count = party_counts.groupby(level=0).max()
+    
+    stability_df = pd.concat({
+        'nom_commune': g['nom_commune'].first(),
+        # Calcul de la diversité des partis gagnants
+        'volatilite': g['famille_politique'].nunique() / total_elections,
+        'parti_dominant': dominant,
+        'dominance_pct': dominant_count / total_elections * 100,
+        'nb_elections': total_elections,
+    }, axis=1).reindex(total_elections.index)
+    stability_df = stability_df[stability_df['nb_elections'] > 1].reset_index()
+    
+    # Sauvegarde de l'analyse
     stability_df.to_csv(stability_path, index=False)
+    if cache_path:
+        _store_cache(cache_path, lambda path: stability_df.to_parquet(path, index=False))
     
     print(f"📊 Analyse de stabilité sauvegardée: {stability_path}")
     return stability_df
 
-def create_choropleth_map(df, geojson_data, year, scrutin, tour, output_dir):
-    """Crée une carte choroplèthe pour une élection donnée"""
-    print(f"🗺️  Génération carte: {year} {scrutin} T{tour}")
-    
-    # Filtrage des données
-    election_data = df[
-        (df['annee'] == year) & 
-        (df['type_scrutin'] == scrutin) & 
-        (df['tour'] == tour)
-    ].copy()
-    
-    if election_data.empty:
-        print(f"⚠️  Aucune donnée pour {year} {scrutin} T{tour}")
-        return None
+def _set_bounds(ax, bounds):
+    """Fixe les limites des axes sur l'emprise des communes"""
+    xmin, ymin, xmax, ymax = bounds
+    ax.set_xlim(xmin, xmax)
+    ax.set_ylim(ymin, ymax)
+
+def _get_map_figure(kind, geometry, **pc_kwargs):
+    """
+    Retourne la figure de carte en cache pour ce type de carte.
     
-    # Couleurs des partis
-    color_map = create_party_color_map()
+    La figure, les axes et la PolyCollection des communes sont créés au premier
+    appel ; les appels suivants ne font que retirer les textes de l'élection
+    précédente. Il reste à l'appelant à mettre à jour couleurs, titre et légende.
     
-    # Configuration de la figure
-    fig, ax = plt.subplots(1, 1, figsize=(14, 10))
-    ax.set_aspect('equal')
-    ax.axis('off')
+    Returns:
+        dict: {'fig', 'ax', 'pc'} (+ entrées ajoutées par l'appelant, ex. 'sm')
+    """
+    codes, _, _, bounds = geometry
+    key = (kind, codes.tobytes())
+    if key not in _MAP_CACHE:
+        # Figure dimensionnée d'après l'emprise (carte ~12 pouces de large, place à droite
+        # pour la légende ou la barre de couleur, marge pour le titre) et mise en page
+        # contrainte : pas de bandes vides ni de second rendu pour bbox_inches='tight'
+        xmin, ymin, xmax, ymax = bounds
+        aspect = (ymax - ymin) / (xmax - xmin) if xmax > xmin else 1.0
+        fig, ax = plt.subplots(1, 1, figsize=(14, 12 * aspect + 1), layout='constrained')
+        ax.set_aspect('equal')
+        ax.axis('off')
+        pc = PolyCollection(ring_views(geometry), edgecolors='white', linewidths=0.5, alpha=0.8, **pc_kwargs)
+        pc.set_rasterized(True)
+        ax.add_collection(pc)
+        
+        # Emprise fixée une fois à partir des bornes pré-calculées (pas d'autoscale)
+        _set_bounds(ax, bounds)
+        _MAP_CACHE[key] = {'fig': fig, 'ax': ax, 'pc': pc}
+    
+    entry = _MAP_CACHE[key]
+    for text in list(entry['ax'].texts):
+        text.remove()
+    return entry
+
+def create_choropleth_map(election_data, geometry, year, scrutin, tour, output_dir, color_lut, dpi=150, labels=0):
+    """
+    Crée une carte choroplèthe pour une élection donnée (election_data : lignes de l'élection).
     
-    # Dictionnaire des données électorales par commune
-    election_dict = election_data.set_index('code_commune_insee').to_dict('index')
+    Seules les `labels` plus grandes communes (par aire) reçoivent leur nom ;
+    0 désactive les étiquettes.
+    """
+    print(f"🗺️  Génération carte: {year} {scrutin} T{tour}")
     
-    # Dessiner chaque commune
-    legend_parties = set()
+    if election_data is None or election_data.empty:
+        print(f"⚠️  Aucune donnée pour {year} {scrutin} T{tour}")
+        return None
     
-    for feature in geojson_data['features']:
-        code_insee = feature['properties'].get('code', '').zfill(5)
-        
-        if code_insee in election_dict:
-            parti = election_dict[code_insee]['famille_politique']
-            color = color_map.get(parti, '#CCCCCC')  # Gris par défaut
-            legend_parties.add(parti)
-        else:
-            color = '#F0F0F0'  # Gris clair pour les communes sans données
-            parti = 'Sans données'
-        
-        # Extraction des coordonnées de la géométrie
-        if feature['geometry']['type'] == 'Polygon':
-            coords = feature['geometry']['coordinates'][0]
-        elif feature['geometry']['type'] == 'MultiPolygon':
-            # Pour les MultiPolygons, prendre le premier polygone
-            coords = feature['geometry']['coordinates'][0][0]
-        else:
-            continue
-        
-        # Conversion en arrays numpy pour matplotlib
-        x_coords = [coord[0] for coord in coords]
-        y_coords = [coord[1] for coord in coords]
-        
-        # Dessiner le polygone
-        ax.fill(x_coords, y_coords, color=color, edgecolor='white', linewidth=0.5, alpha=0.8)
-        
-        # Ajouter le nom de la commune si disponible
-        if code_insee in election_dict and len(coords) > 3:
-            centroid_x = sum(x_coords) / len(x_coords)
-            centroid_y = sum(y_coords) / len(y_coords)
-            commune_name = election_dict[code_insee].get('nom_commune', '')
-            if len(commune_name) < 15:  # Éviter les noms trop longs
-                ax.text(centroid_x, centroid_y, commune_name, 
-                       fontsize=6, ha='center', va='center', 
-                       bbox=dict(boxstyle="round,pad=0.1", facecolor='white', alpha=0.7))
+    # Géométries et couleurs dans l'ordre des features GeoJSON
+    codes, coords, offsets, _ = geometry
+    legend_parties, colors = _party_colors(election_data, geometry, color_lut)
+    
+    # Figure réutilisée : seules les couleurs des communes changent
+    entry = _get_map_figure('choropleth', geometry)
+    fig, ax = entry['fig'], entry['ax']
+    entry['pc'].set_facecolor(colors)
+    
+    # Noms des communes : uniquement les `labels` plus grandes (un ax.text par étiquette)
+    if labels > 0:
+        names = election_data.set_index('code_commune_insee')['nom_commune'].reindex(codes)
+        eligible = (names.str.len() < 15).to_numpy() & (np.diff(offsets) > 3)  # Éviter les noms trop longs
+        candidates = np.flatnonzero(eligible)
+        top = candidates[np.argsort(-ring_areas(geometry)[candidates], kind='stable')[:labels]]
+        centroids = ring_centroids(geometry)
+        for i in top:
+            centroid_x, centroid_y = centroids[i]
+            if not point_in_ring(centroid_x, centroid_y, coords[offsets[i]:offsets[i + 1]]):
+                continue  # Commune concave : l'étiquette tomberait sur une voisine
+            ax.text(centroid_x, centroid_y, names.iat[i], 
+                   fontsize=6, ha='center', va='center', 
+                   bbox=dict(boxstyle="round,pad=0.1", facecolor='white', alpha=0.7))
     
     # Légende
     legend_elements = []
     for parti in sorted(legend_parties):
-        color = color_map.get(parti, '#CCCCCC')
+        color = _PARTY_COLOR_MAP.get(parti, '#CCCCCC')
         legend_elements.append(mpatches.Patch(color=color, label=parti))
     
     ax.legend(handles=legend_elements, loc='upper left', bbox_to_anchor=(1.02, 1))
@@ -270,14 +497,13 @@ def create_choropleth_map(df, geojson_data, year, scrutin, tour, output_dir):
     # Sauvegarde
     filename = f'carte_{year}_{scrutin}_t{tour}.png'
     output_path = os.path.join(output_dir, filename)
-    plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    fig.savefig(output_path, dpi=dpi, facecolor='white')
     
     print(f"✅ Carte sauvegardée: {filename}")
     return output_path
 
-def create_evolution_comparison(df, geojson_data, output_dir):
-    """Crée une comparaison de l'évolution entre plusieurs élections"""
+def create_evolution_comparison(elections, geometry, output_dir, color_lut, dpi=150):
+    """Crée une comparaison de l'évolution entre plusieurs élections (elections : {(annee, scrutin, tour): lignes})"""
     print("🗺️  Génération: Comparaison évolution")
     
     # Sélection d'élections clés pour comparaison
@@ -287,8 +513,12 @@ def create_evolution_comparison(df, geojson_data, output_dir):
         (2022, 'presidentielle', 1)
     ]
     
-    fig, axes = plt.subplots(1, 3, figsize=(20, 8))
-    color_map = create_party_color_map()
+    # Figure dimensionnée d'après l'emprise (+ marge titre/légende) et mise en page
+    # contrainte : pas de bbox_inches='tight' à l'export
+    verts = ring_views(geometry)
+    xmin, ymin, xmax, ymax = geometry[3]
+    fig, axes = plt.subplots(1, 3, figsize=(20, 20 / 3 * (ymax - ymin) / (xmax - xmin) + 1.5),
+                             layout='constrained')
     
     for i, (year, scrutin, tour) in enumerate(key_elections):
         ax = axes[i]
@@ -296,75 +526,44 @@ def create_evolution_comparison(df, geojson_data, output_dir):
         ax.axis('off')
         
         # Données de l'élection
-        election_data = df[
-            (df['annee'] == year) & 
-            (df['type_scrutin'] == scrutin) & 
-            (df['tour'] == tour)
-        ].copy()
+        election_data = elections.get((year, scrutin, tour))
         
-        if election_data.empty:
+        if election_data is None or election_data.empty:
             ax.text(0.5, 0.5, f'Pas de données\\n{year} {scrutin}', 
                    ha='center', va='center', transform=ax.transAxes)
             continue
         
-        election_dict = election_data.set_index('code_commune_insee').to_dict('index')
-        
         # Dessiner les communes
-        for feature in geojson_data['features']:
-            code_insee = feature['properties'].get('code', '').zfill(5)
-            
-            if code_insee in election_dict:
-                parti = election_dict[code_insee]['famille_politique']
-                color = color_map.get(parti, '#CCCCCC')
-            else:
-                color = '#F0F0F0'
-            
-            # Géométrie
-            if feature['geometry']['type'] == 'Polygon':
-                coords = feature['geometry']['coordinates'][0]
-            elif feature['geometry']['type'] == 'MultiPolygon':
-                coords = feature['geometry']['coordinates'][0][0]
-            else:
-                continue
-            
-            x_coords = [coord[0] for coord in coords]
-            y_coords = [coord[1] for coord in coords]
-            ax.fill(x_coords, y_coords, color=color, edgecolor='white', linewidth=0.3, alpha=0.8)
+        _, colors = _party_colors(election_data, geometry, color_lut)
+        ax.add_collection(PolyCollection(verts, facecolors=colors, edgecolors='white',
+                                         linewidths=0.3, alpha=0.8))
+        _set_bounds(ax, geometry[3])
         
         ax.set_title(f'{scrutin.title()} {year}', fontsize=14)
     
     # Légende commune
     all_parties = set()
-    for year, scrutin, tour in key_elections:
-        election_data = df[(df['annee'] == year) & (df['type_scrutin'] == scrutin) & (df['tour'] == tour)]
-        all_parties.update(election_data['famille_politique'].unique())
+    for key in key_elections:
+        if key in elections:
+            all_parties.update(elections[key]['famille_politique'].unique())
     
-    legend_elements = [mpatches.Patch(color=color_map.get(parti, '#CCCCCC'), label=parti) 
+    legend_elements = [mpatches.Patch(color=_PARTY_COLOR_MAP.get(parti, '#CCCCCC'), label=parti) 
                       for parti in sorted(all_parties)]
-    fig.legend(handles=legend_elements, loc='center', bbox_to_anchor=(0.5, 0.02), ncol=6)
+    fig.legend(handles=legend_elements, loc='outside lower center', ncol=6)
     
-    plt.suptitle('Évolution des tendances électorales - Présidentielles T1', fontsize=16, y=0.95)
-    plt.tight_layout()
-    plt.subplots_adjust(bottom=0.1)
+    fig.suptitle('Évolution des tendances électorales - Présidentielles T1', fontsize=16)
     
     output_path = os.path.join(output_dir, 'evolution_presidentielles_comparison.png')
-    plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    fig.savefig(output_path, dpi=dpi, facecolor='white')
+    plt.close(fig)
     
     return output_path
 
-def create_participation_map(df, geojson_data, year, scrutin, tour, output_dir):
-    """Crée une carte de la participation électorale"""
+def create_participation_map(election_data, geometry, year, scrutin, tour, output_dir, dpi=150):
+    """Crée une carte de la participation électorale (election_data : lignes de l'élection)"""
     print(f"🗺️  Génération carte participation: {year} {scrutin} T{tour}")
     
-    # Filtrage des données
-    election_data = df[
-        (df['annee'] == year) & 
-        (df['type_scrutin'] == scrutin) & 
-        (df['tour'] == tour)
-    ].copy()
-    
-    if election_data.empty or 'turnout_pct' not in election_data.columns:
+    if election_data is None or election_data.empty or 'turnout_pct' not in election_data.columns:
         print(f"⚠️  Pas de données de participation pour {year} {scrutin} T{tour}")
         return None
     
@@ -380,40 +579,25 @@ def create_participation_map(df, geojson_data, year, scrutin, tour, output_dir):
     norm = Normalize(vmin=min_participation, vmax=max_participation)
     cmap = cm.YlOrRd  # Colormap du jaune au rouge
     
-    # Configuration de la figure
-    fig, ax = plt.subplots(1, 1, figsize=(14, 10))
-    ax.set_aspect('equal')
-    ax.axis('off')
-    
-    participation_dict = participation_data.set_index('code_commune_insee')['turnout_pct'].to_dict()
-    
-    # Dessiner chaque commune
-    for feature in geojson_data['features']:
-        code_insee = feature['properties'].get('code', '').zfill(5)
-        
-        if code_insee in participation_dict:
-            participation = participation_dict[code_insee]
-            color = cmap(norm(participation))
-        else:
-            color = '#F0F0F0'  # Gris pour les communes sans données
-        
-        # Géométrie
-        if feature['geometry']['type'] == 'Polygon':
-            coords = feature['geometry']['coordinates'][0]
-        elif feature['geometry']['type'] == 'MultiPolygon':
-            coords = feature['geometry']['coordinates'][0][0]
-        else:
-            continue
-        
-        x_coords = [coord[0] for coord in coords]
-        y_coords = [coord[1] for coord in coords]
-        ax.fill(x_coords, y_coords, color=color, edgecolor='white', linewidth=0.5, alpha=0.8)
-    
-    # Barre de couleur
-    sm = plt.cm.ScalarMappable(cmap=cmap, norm=norm)
-    sm.set_array([])
-    cbar = plt.colorbar(sm, ax=ax, shrink=0.6, aspect=30)
-    cbar.set_label('Taux de participation (%)', rotation=270, labelpad=20)
+    # Participation par feature : la colormap est appliquée par matplotlib (NaN -> gris)
+    codes = geometry[0]
+    turnout = participation_data.set_index('code_commune_insee')['turnout_pct'].reindex(codes).to_numpy(dtype=np.float32)
+    
+    # Figure réutilisée : seules les valeurs et l'échelle de couleurs changent
+    entry = _get_map_figure('participation', geometry,
+                            cmap=cmap.with_extremes(bad='#F0F0F0'))  # Gris pour les communes sans données
+    fig, ax = entry['fig'], entry['ax']
+    entry['pc'].set_array(np.ma.masked_invalid(turnout))
+    entry['pc'].set_norm(norm)
+    
+    # Barre de couleur (créée une fois, puis mise à jour avec la nouvelle échelle)
+    if 'sm' not in entry:
+        entry['sm'] = plt.cm.ScalarMappable(cmap=cmap, norm=norm)
+        entry['sm'].set_array([])
+        cbar = fig.colorbar(entry['sm'], ax=ax, shrink=0.6, aspect=30)
+        cbar.set_label('Taux de participation (%)', rotation=270, labelpad=20)
+    else:
+        entry['sm'].set_norm(norm)
     
     # Titre et informations
     ax.set_title(f'Taux de participation - {scrutin.title()} {year} Tour {tour}', 
@@ -429,12 +613,35 @@ def create_participation_map(df, geojson_data, year, scrutin, tour, output_dir):
     # Sauvegarde
     filename = f'participation_{year}_{scrutin}_t{tour}.png'
     output_path = os.path.join(output_dir, filename)
-    plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    fig.savefig(output_path, dpi=dpi, facecolor='white')
     
     print(f"✅ Carte de participation sauvegardée: {filename}")
     return output_path
 
+def render_election_maps(batch, geometry, color_lut, output_dir, dpi=150, labels=0):
+    """
+    Génère la carte des résultats et la carte de participation d'un lot d'élections.
+    
+    Exécutée dans un worker joblib : le lot est traité séquentiellement pour
+    profiter de la figure en cache dans le processus.
+    
+    Args:
+        batch (list): Liste de ((annee, type_scrutin, tour), election_data)
+        
+    Returns:
+        list: Chemins des cartes générées
+    """
+    output_files = []
+    for (year, scrutin, tour), election_data in batch:
+        result_map = create_choropleth_map(election_data, geometry, year, scrutin, tour, output_dir, color_lut, dpi, labels)
+        if result_map:
+            output_files.append(result_map)
+        
+        participation_map = create_participation_map(election_data, geometry, year, scrutin, tour, output_dir, dpi)
+        if participation_map:
+            output_files.append(participation_map)
+    return output_files
+
 def main():
     """Fonction principale"""
     parser = argparse.ArgumentParser(description="Analyse géographique des tendances électorales")
@@ -449,6 +656,14 @@ def main():
     parser.add_argument("--tour", type=int, default=1, help="Tour du scrutin")
     parser.add_argument("--all-elections", action="store_true",
                        help="Générer des cartes pour toutes les élections")
+    parser.add_argument("--dpi", type=int, default=150,
+                       help="Résolution des cartes PNG exportées")
+    parser.add_argument("--labels", type=int, nargs="?", const=20, default=0,
+                       help="Afficher le nom des N plus grandes communes (20 si N omis, désactivé par défaut)")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Ne pas lire ni écrire le cache disque (<output>/.cache)")
+    parser.add_argument("--jobs", type=int, default=-1,
+                       help="Nombre de processus pour --all-elections (-1 = tous les cœurs)")
     
     args = parser.parse_args()
     
@@ -456,11 +671,22 @@ def main():
     os.makedirs(args.output, exist_ok=True)
     print(f"📁 Répertoire de sortie: {args.output}")
     
-    # Chargement des données
-    df, geojson_data = load_data(args.data, args.geojson)
+    # Chargement des données (géométries préparées une seule fois pour toutes les cartes)
+    # Cache disque des résultats dérivés, invalidé quand les fichiers sources changent
+    cache_dir = None if args.no_cache else os.path.join(args.output, '.cache')
+    df, geometry = load_data(args.data, args.geojson, cache_dir)
+    
+    # Familles politiques en category (dès la lecture) : couleurs obtenues par codes entiers
+    color_lut = build_color_lut(df['famille_politique'].cat.categories, _PARTY_COLOR_MAP)
+    
+    # Découpage unique du DataFrame par élection (annee, type_scrutin, tour)
+    elections = {key: sub for key, sub in df.groupby(['annee', 'type_scrutin', 'tour'], sort=False, observed=True)}
     
     # Analyse de stabilité géographique
-    analyze_geographic_trends(df, args.output)
+    stability_cache = None
+    if cache_dir and pa is not None:  # Parquet via pyarrow
+        stability_cache = _cache_file(cache_dir, 'stability', args.data, 'parquet')
+    analyze_geographic_trends(df, args.output, stability_cache)
     
     output_files = []
     
@@ -468,28 +694,27 @@ def main():
         # Génération de cartes pour toutes les élections
         print("🗺️  Génération de toutes les cartes électorales...")
         
-        elections = df.groupby(['annee', 'type_scrutin', 'tour']).size().reset_index()
+        # Élections indépendantes : un lot contigu par processus (ordre des fichiers conservé)
+        items = list(elections.items())
+        n_jobs = max(1, min(effective_n_jobs(args.jobs), len(items)))
+        batch_size = -(-len(items) // n_jobs)
+        batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
         
-        for _, election in elections.iterrows():
-            year, scrutin, tour = election['annee'], election['type_scrutin'], election['tour']
-            
-            # Carte des résultats
-            result_map = create_choropleth_map(df, geojson_data, year, scrutin, tour, args.output)
-            if result_map:
-                output_files.append(result_map)
-            
-            # Carte de participation
-            participation_map = create_participation_map(df, geojson_data, year, scrutin, tour, args.output)
-            if participation_map:
-                output_files.append(participation_map)
+        results = Parallel(n_jobs=n_jobs, backend='loky')(
+            delayed(render_election_maps)(batch, geometry, color_lut, args.output, args.dpi, args.labels)
+            for batch in batches
+        )
+        for batch_files in results:
+            output_files.extend(batch_files)
     
     elif args.year and args.scrutin:
         # Génération pour une élection spécifique
-        result_map = create_choropleth_map(df, geojson_data, args.year, args.scrutin, args.tour, args.output)
+        election_data = elections.get((args.year, args.scrutin, args.tour))
+        result_map = create_choropleth_map(election_data, geometry, args.year, args.scrutin, args.tour, args.output, color_lut, args.dpi, args.labels)
         if result_map:
             output_files.append(result_map)
         
-        participation_map = create_participation_map(df, geojson_data, args.year, args.scrutin, args.tour, args.output)
+        participation_map = create_participation_map(election_data, geometry, args.year, args.scrutin, args.tour, args.output, args.dpi)
         if participation_map:
             output_files.append(participation_map)
     
@@ -498,14 +723,15 @@ def main():
         print("🗺️  Génération des cartes par défaut...")
         
         # Comparaison des présidentielles
-        evolution_map = create_evolution_comparison(df, geojson_data, args.output)
+        evolution_map = create_evolution_comparison(elections, geometry, args.output, color_lut, args.dpi)
         if evolution_map:
             output_files.append(evolution_map)
         
         # Dernière élection présidentielle
         latest_presidential = df[df['type_scrutin'] == 'presidentielle']['annee'].max()
         if pd.notna(latest_presidential):
-            result_map = create_choropleth_map(df, geojson_data, int(latest_presidential), 'presidentielle', 1, args.output)
+            latest_key = (int(latest_presidential), 'presidentielle', 1)
+            result_map = create_choropleth_map(elections.get(latest_key), geometry, *latest_key, args.output, color_lut, args.dpi, args.labels)
             if result_map:
                 output_files.append(result_map)
     
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Noyaux numériques sur les anneaux de communes (aire, point dans polygone).
+
+Ces fonctions sont de simples boucles sur des tableaux numpy (N, 2) : avec
+numba installé, elles sont compilées en code natif (@njit, cache disque) au
+premier appel de l'une d'elles ; sans numba, elles restent utilisables en
+Python pur. numba n'est importé qu'à ce premier appel, pas au chargement.
+
+Utilisées par geographic_analyzer.py pour la sélection et le placement des
+étiquettes de communes.
+
+Auteur: Équipe MSPR Nantes
+Date: 2024-2025
+"""
+
+import functools
+import importlib.util
+
+import numpy as np
+
+# Compilation JIT (optionnelle) : détection sans import, numba étant long à charger
+HAS_NUMBA = importlib.util.find_spec('numba') is not None
+
+# Fonctions Python des noyaux, compilées ensemble au premier appel
+_KERNELS = []
+
+def _compile_kernels():
+    """Remplace les noyaux du module par leurs versions numba (Python pur si l'import échoue)"""
+    try:
+        from numba import njit
+    except ImportError:
+        njit = None
+    for func in _KERNELS:
+        # Noms du module rebindés : un noyau compilé appelle les autres en natif
+        globals()[func.__name__] = func if njit is None else njit(cache=True, fastmath=True)(func)
+
+def _jit(func):
+    """Compile func avec numba au premier appel si disponible, sinon la renvoie telle quelle"""
+    if not HAS_NUMBA:
+        return func
+    _KERNELS.append(func)
+    
+    @functools.wraps(func)
+    def dispatch(*args):
+        if globals()[func.__name__] is dispatch:
+            _compile_kernels()
+        return globals()[func.__name__](*args)
+    return dispatch
+
+@_jit
+def ring_area(xy):
+    """Aire d'un anneau (formule du lacet), dans l'unité des coordonnées"""
+    n = xy.shape[0]
+    if n < 3:
+        # Anneau dégénéré (ou vide) : aire nulle, sans lecture hors limites
+        return 0.0
+    # Calcul en float64, origine au premier sommet pour limiter les erreurs d'arrondi
+    x0, y0 = np.float64(xy[0, 0]), np.float64(xy[0, 1])
+    total = 0.0
+    for i in range(n):
+        j = i + 1 if i + 1 < n else 0
+        xi, yi = np.float64(xy[i, 0]) - x0, np.float64(xy[i, 1]) - y0
+        xj, yj = np.float64(xy[j, 0]) - x0, np.float64(xy[j, 1]) - y0
+        total += xi * yj - xj * yi
+    return 0.5 * abs(total)
+
+@_jit
+def ring_areas(coords, offsets):
+    """Aire de chaque anneau du tableau à plat coords (anneau i = coords[offsets[i]:offsets[i + 1]])"""
+    areas = np.empty(offsets.shape[0] - 1)
+    for i in range(areas.shape[0]):
+        areas[i] = ring_area(coords[offsets[i]:offsets[i + 1]])
+    return areas
+
+@_jit
+def point_in_ring(px, py, xy):
+    """Test pair-impair : True si le point (px, py) est à l'intérieur de l'anneau"""
+    n = xy.shape[0]
+    inside = False
+    j = n - 1
+    for i in range(n):
+        xi, yi = xy[i, 0], xy[i, 1]
+        xj, yj = xy[j, 0], xy[j, 1]
+        if (yi > py) != (yj > py) and px < (xj - xi) * (py - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
@@ -4,7 +4,7 @@ Module de génération de dashboards interactifs pour l'exploration électorale.
 
 Ce module crée une suite de visualisations web interactives utilisant Plotly
 pour permettre l'exploration dynamique des données électorales de Nantes Métropole.
-Les dashboards générés sont des fichiers HTML autonomes, consultables dans 
+Les dashboards générés sont des fichiers HTML statiques, consultables dans 
 n'importe quel navigateur sans serveur requis.
 
 Dashboards générés:
@@ -40,7 +40,7 @@ Dashboards générés:
        - Exploration guidée des relations causales
 
 Fonctionnalités techniques:
-    - Export HTML autonome (pas de serveur requis)
+    - Export HTML hors ligne, plotly.min.js partagé par toutes les pages (pas de serveur requis)
     - Interface responsive adaptée mobile/desktop
     - Performance optimisée pour datasets importants
     - Tooltips informatifs et légendes interactives
@@ -58,21 +58,43 @@ Date: 2024-2025
 
 import argparse
 import os
+import pickle
 import sys
+import warnings
 import pandas as pd
 import numpy as np
+from joblib import Parallel, delayed, effective_n_jobs
 from pathlib import Path
 
 try:
     import plotly.graph_objects as go
     import plotly.express as px
     from plotly.subplots import make_subplots
-    import plotly.offline as pyo
+    import plotly.io as pio
+    from plotly.offline import get_plotlyjs
     PLOTLY_AVAILABLE = True
 except ImportError:
     PLOTLY_AVAILABLE = False
     print("⚠️  Plotly non disponible. Installation requise: pip install plotly")
 
+try:
+    # Sérialisation JSON rapide des figures (optionnelle)
+    import orjson
+except ImportError:
+    orjson = None
+
+# Colonnes utilisées par l'ensemble des dashboards
+NEEDED_COLUMNS = ['annee', 'date_scrutin', 'famille_politique', 'type_scrutin', 'nom_commune',
+                  'code_commune_insee', 'turnout_pct', 'blancs_pct', 'population',
+                  'revenu_median_uc_euros', 'taux_chomage_pct', 'taux_pauvrete_pct']
+# Nombre maximal de lignes (communes) de la heatmap ; au-delà, lignes regroupées par blocs
+HEATMAP_MAX_ROWS = 200
+# Types compacts appliqués dès la lecture du CSV
+NEEDED_DTYPES = {'annee': 'Int16', 'turnout_pct': 'float32', 'blancs_pct': 'float32', 'population': 'Int32'}
+# Version du contenu de precompute_aggregates : à incrémenter à chaque changement de
+# structure, pour invalider les caches pickle existants
+AGGREGATES_VERSION = 1
+
 def load_data(filepath):
     """
     Charge et prépare les données électorales pour les visualisations interactives.
@@ -96,76 +118,287 @@ def load_data(filepath):
     Note:
         Les données manquantes en famille_politique et année sont supprimées
         car elles sont critiques pour toutes les visualisations.
+        Les agrégats qui en sont tirés sont mis en cache par load_aggregates.
     """
     print(f"Chargement des données depuis {filepath}")
     
-    try:
-        df = pd.read_csv(filepath)
-    except FileNotFoundError:
+    if not os.path.exists(filepath):
         print(f"❌ Fichier non trouvé: {filepath}")
         sys.exit(1)
     
+    if filepath.endswith('.feather'):
+        # Fichier Arrow partagé préparé par run_all_visualizations
+        df = pd.read_feather(filepath, columns=NEEDED_COLUMNS).astype(NEEDED_DTYPES)
+    else:
+        df = pd.read_csv(filepath, usecols=NEEDED_COLUMNS, dtype=NEEDED_DTYPES)
+    
     # Conversion des types
     df['annee'] = pd.to_numeric(df['annee'], errors='coerce')
     df['date_scrutin'] = pd.to_datetime(df['date_scrutin'], errors='coerce')
     
     # Nettoyage
     df = df.dropna(subset=['annee', 'famille_politique'])
-    df = df[df['famille_politique'].astype(str).str.strip() != '']
+    
+    # Colonnes texte répétitives en category : codes entiers pour groupby/value_counts
+    category_cols = ('famille_politique', 'type_scrutin', 'nom_commune', 'code_commune_insee')
+    for col in category_cols:
+        df[col] = df[col].astype('category')
+    
+    # Familles vides (espaces seuls) : strip sur les seules catégories distinctes, pas ligne à ligne
+    parties = df['famille_politique'].cat.categories
+    blank = parties[parties.str.strip() == '']
+    if len(blank):
+        df = df[~df['famille_politique'].isin(blank)].copy()
+        for col in category_cols:
+            df[col] = df[col].cat.remove_unused_categories()
     
     print(f"✅ Données chargées: {len(df)} lignes, {len(df.columns)} colonnes")
     return df
 
-def create_interactive_timeline(df, output_dir):
+def histogram2d(row_codes, col_codes, n_rows, n_cols):
+    """Comptage des couples de codes entiers (row_codes[i], col_codes[i]) : np.bincount sur row * n_cols + col"""
+    flat = row_codes.astype(np.int64) * n_cols + col_codes
+    return np.bincount(flat, minlength=n_rows * n_cols).reshape(n_rows, n_cols).astype(np.int32)
+
+def _year_party_matrix(df):
+    """DataFrame annee x famille_politique du nombre de victoires (codes entiers + histogram2d)"""
+    years, year_codes = np.unique(df['annee'].to_numpy(), return_inverse=True)
+    parties = df['famille_politique'].cat
+    counts = histogram2d(year_codes, parties.codes.to_numpy(), len(years), len(parties.categories))
+    matrix = pd.DataFrame(counts, index=pd.Index(years, name='annee'),
+                          columns=pd.CategoricalIndex(parties.categories, name='famille_politique'))
+    return matrix.loc[:, matrix.sum() > 0]  # Familles observées uniquement
+
+def write_bytes(path, data):
+    """Écrit des octets déjà encodés directement sur le descripteur (sans couche texte Python)"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:  # os.write peut n'écrire qu'une partie du tampon
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+def write_figure(fig, output_path):
+    """
+    Écrit une figure en HTML sans y incorporer plotly.js.
+    
+    La bibliothèque est écrite une seule fois (plotly.min.js) dans le même
+    répertoire que les dashboards, qui y font référence : les fichiers restent
+    consultables hors ligne sans dupliquer ~3 Mo de JavaScript par page.
+    Avec orjson installé, le JSON de la figure (tableaux numpy compris) est
+    sérialisé en C au lieu du module json standard. La page est encodée
+    une fois en UTF-8 puis écrite en octets par write_bytes.
+    """
+    if orjson is not None:
+        # Réglé ici plutôt qu'à l'import : la configuration doit valoir aussi dans les workers joblib
+        pio.json.config.default_engine = 'orjson'
+    # plotly.min.js est écrit par main() avant la génération des pages
+    html = pio.to_html(fig, include_plotlyjs='directory', full_html=True, validate=False)
+    write_bytes(output_path, html.encode('utf-8'))
+
+def precompute_aggregates(df):
+    """
+    Calcule en une passe les agrégats partagés par les cinq dashboards.
+    
+    Les comptages par famille politique sont faits sur les codes entiers
+    des catégories (np.unique) ou via la matrice année x famille remplie par
+    histogram2d : le DataFrame n'est balayé qu'une fois par jeu de clés.
+    
+    Args:
+        df (pd.DataFrame): Données préparées par load_data
+        
+    Returns:
+        dict: Agrégats indexés par nom
+            - year_type_party: Series des victoires par (annee, type_scrutin, famille_politique)
+            - year_party_counts: DataFrame annee x famille_politique des victoires
+            - party_counts: Series des victoires par famille, par ordre décroissant
+            - part_by_type: Series de la participation moyenne par type de scrutin
+            - yearly: DataFrame des moyennes annuelles de turnout_pct et blancs_pct
+            - heatmap: DataFrame commune x année de la participation moyenne
+            - socio: (x_var, y_var, DataFrame agrégé) ou None si variables insuffisantes
+    """
+    # value_counts : un seul passage de comptage compilé, sans tri par effectif
+    year_type_party = df.value_counts(['annee', 'type_scrutin', 'famille_politique'], sort=False)
+    # Victoires par famille : comptage des codes de catégorie (entiers), sans hachage de chaînes
+    parties = df['famille_politique'].cat
+    codes, counts = np.unique(parties.codes.to_numpy(), return_counts=True)
+    observed = codes >= 0  # -1 = valeur manquante
+    party_counts = pd.Series(counts[observed], name='count',
+                             index=parties.categories[codes[observed]].rename('famille_politique'))
+    
+    return {
+        'year_type_party': year_type_party,
+        'year_party_counts': _year_party_matrix(df),
+        'party_counts': party_counts.sort_values(ascending=False, kind='stable'),
+        'part_by_type': df.groupby('type_scrutin', observed=True)['turnout_pct'].mean(),
+        'yearly': df.groupby('annee').agg({'turnout_pct': 'mean', 'blancs_pct': 'mean'}),
+        'heatmap': _heatmap_aggregate(df),
+        'socio': _socio_aggregate(df),
+    }
+
+def load_aggregates(data_path, output_dir, use_cache=True):
+    """
+    Agrégats des dashboards, relus depuis un cache pickle si possible.
+    
+    Le cache output_dir/.aggs-v<version>-pd<pandas>-<mtime_ns>-<taille>.pkl est
+    invalidé par AGGREGATES_VERSION, la version de pandas, la date de
+    modification et la taille du CSV : tant que rien ne change, les
+    reconstructions successives (mise en forme, couleurs) évitent le
+    chargement et les agrégations pandas. Un cache illisible est reconstruit.
+    """
+    cache_path = None
+    if use_cache and os.path.exists(data_path):
+        stat = os.stat(data_path)
+        cache_path = Path(output_dir) / (f'.aggs-v{AGGREGATES_VERSION}-pd{pd.__version__}'
+                                         f'-{stat.st_mtime_ns}-{stat.st_size}.pkl')
+        if cache_path.exists():
+            try:
+                aggs = pickle.loads(cache_path.read_bytes())
+                print(f"⚡ Agrégats relus depuis le cache: {cache_path}")
+                return aggs
+            except Exception as e:  # Fichier tronqué, classes pandas incompatibles... : reconstruction
+                print(f"⚠️  Cache des agrégats ignoré ({e})")
+    
+    aggs = precompute_aggregates(load_data(data_path))
+    
+    if cache_path is not None:
+        # Une seule version conservée : suppression des caches périmés
+        for stale in Path(output_dir).glob('.aggs-*.pkl'):
+            stale.unlink()
+        cache_path.write_bytes(pickle.dumps(aggs, protocol=5))
+    return aggs
+
+def _heatmap_aggregate(df):
+    """Matrice commune x année de la participation moyenne"""
+    # Moyenne groupée sur codes entiers puis pivot (plus direct que pivot_table)
+    return df.groupby(['nom_commune', 'annee'], observed=True)['turnout_pct'].mean().unstack('annee')
+
+def _socio_aggregate(df):
+    """
+    Agrégat du scatter socio-économique : moyennes des deux premières variables
+    disponibles et nombre de scrutins par (commune, année, famille politique).
+    """
+    # Vérification des colonnes disponibles
+    socio_cols = ['population', 'revenu_median_uc_euros', 'taux_chomage_pct', 
+                  'taux_pauvrete_pct', 'turnout_pct']
+    available_cols = [col for col in socio_cols if col in df.columns and df[col].notna().sum() > 10]
+    
+    if len(available_cols) < 2:
+        return None
+    
+    # Scatter plot avec les deux premières variables disponibles
+    x_var = available_cols[0]
+    y_var = available_cols[1]
+    
+    # Filtrage des données valides
+    valid_data = df.dropna(subset=[x_var, y_var, 'famille_politique'])
+    
+    # Agrégation avant Plotly : moyennes par groupe et nombre de scrutins
+    plot_data = valid_data.groupby(['nom_commune', 'annee', 'famille_politique'], as_index=False, observed=True).agg(
+        **{x_var: (x_var, 'mean'), y_var: (y_var, 'mean'), 'nb_scrutins': (x_var, 'size')})
+    return x_var, y_var, plot_data
+
+# Avertissement interne à Plotly Express (get_group avec une clé scalaire), sans effet sur les figures
+_PX_GET_GROUP_WARNING = 'When grouping with a length-1 list-like'
+
+def _category_orders(df, *columns):
+    """Ordre de première apparition des valeurs (ordre par défaut de Plotly), pour category_orders"""
+    return {col: [str(value) for value in df[col].unique()] for col in columns}
+
+def create_interactive_timeline(aggs, output_dir):
     """Timeline interactive des résultats électoraux"""
     print("🎯 Génération: Timeline interactive")
     
     # Préparation des données pour la timeline
-    timeline_data = df.groupby(['annee', 'type_scrutin', 'famille_politique']).size().reset_index(name='count')
-    
-    fig = px.scatter(timeline_data, x='annee', y='famille_politique', size='count',
-                    color='type_scrutin', hover_name='famille_politique',
-                    title='Timeline des victoires électorales par famille politique',
-                    labels={'annee': 'Année', 'famille_politique': 'Famille Politique'})
+    timeline_data = aggs['year_type_party'].reset_index(name='count')
+    
+    # Colonnes category passées en texte (groupby interne de Plotly sans avertissement
+    # observed) ; ordre des traces fixé explicitement via category_orders
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message=_PX_GET_GROUP_WARNING, category=FutureWarning)
+        fig = px.scatter(timeline_data.astype({'famille_politique': str, 'type_scrutin': str}),
+                        x='annee', y='famille_politique', size='count',
+                        color='type_scrutin', hover_name='famille_politique',
+                        category_orders=_category_orders(timeline_data, 'type_scrutin'),
+                        title='Timeline des victoires électorales par famille politique',
+                        labels={'annee': 'Année', 'famille_politique': 'Famille Politique'})
     
     fig.update_layout(height=600, showlegend=True)
     fig.update_xaxes(dtick=1)  # Affichage de chaque année
     
     output_path = os.path.join(output_dir, 'timeline_interactive.html')
-    pyo.plot(fig, filename=output_path, auto_open=False)
+    write_figure(fig, output_path)
     return output_path
 
-def create_participation_heatmap(df, output_dir):
+def coarsen_rows(pivot_data, max_rows=HEATMAP_MAX_ROWS):
+    """
+    Réduit une matrice commune x année à au plus max_rows lignes.
+    
+    Les lignes sont triées par participation moyenne puis moyennées par blocs
+    de lignes adjacentes ; chaque bloc est étiqueté « première..dernière ».
+    En dessous de max_rows, la matrice est renvoyée telle quelle.
+    """
+    n_rows = len(pivot_data)
+    if n_rows <= max_rows:
+        return pivot_data
+    
+    values = pivot_data.to_numpy(dtype=np.float64)
+    order = np.argsort(np.nanmean(values, axis=1), kind='stable')
+    values = values[order]
+    labels = pivot_data.index.astype(str).to_numpy()[order]
+    
+    block = -(-n_rows // max_rows)
+    n_blocks = -(-n_rows // block)
+    # Complément en NaN jusqu'à un multiple de block, ignoré par nanmean
+    padded = np.full((n_blocks * block, values.shape[1]), np.nan)
+    padded[:n_rows] = values
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # bloc entièrement vide pour une année
+        coarse = np.nanmean(padded.reshape(n_blocks, block, -1), axis=1)
+    
+    starts = np.arange(0, n_rows, block)
+    ends = np.minimum(starts + block, n_rows) - 1
+    index = [labels[i] if i == j else f'{labels[i]}..{labels[j]}' for i, j in zip(starts, ends)]
+    return pd.DataFrame(coarse, index=pd.Index(index, name=pivot_data.index.name),
+                        columns=pivot_data.columns)
+
+def create_participation_heatmap(aggs, output_dir):
     """Heatmap de la participation par commune et année"""
     print("🎯 Génération: Heatmap de participation")
     
-    # Création de la heatmap
-    pivot_data = df.pivot_table(values='turnout_pct', 
-                               index='nom_commune', 
-                               columns='annee', 
-                               aggfunc='mean')
+    # Création de la heatmap (au plus HEATMAP_MAX_ROWS lignes)
+    pivot_data = coarsen_rows(aggs['heatmap'])
+    if len(pivot_data) < len(aggs['heatmap']):
+        print(f"📉 Heatmap réduite à {len(pivot_data)} groupes de communes")
     
-    fig = px.imshow(pivot_data, 
+    # Participation quantifiée en ‰ entiers : JSON bien plus compact pour un rendu identique
+    # (float32 si des cases sont vides, pour conserver les NaN)
+    z = np.round(pivot_data.to_numpy(dtype=np.float32) * 1000)
+    if not np.isnan(z).any():
+        z = z.astype(np.int16)
+    
+    fig = px.imshow(z,
+                   x=pivot_data.columns,
+                   y=pivot_data.index.astype(str),
                    title='Taux de participation par commune et année',
-                   labels=dict(x="Année", y="Commune", color="Participation %"),
+                   labels=dict(x="Année", y="Commune", color="Participation ‰"),
                    aspect="auto")
+    fig.update_traces(hovertemplate='Année: %{x}<br>Commune: %{y}<br>Participation: %{z}‰<extra></extra>')
     
     fig.update_layout(height=800)
     fig.update_xaxes(side="top")
     
     output_path = os.path.join(output_dir, 'participation_heatmap.html')
-    pyo.plot(fig, filename=output_path, auto_open=False)
+    write_figure(fig, output_path)
     return output_path
 
-def create_party_flow_diagram(df, output_dir):
+def create_party_flow_diagram(aggs, output_dir):
     """Diagramme de flux des changements de parti dominant"""
     print("🎯 Génération: Diagramme de flux des changements")
     
-    # Calcul des transitions
-    df_sorted = df.sort_values(['code_commune_insee', 'annee', 'type_scrutin'])
-    
     # Création d'un sunburst chart pour visualiser la répartition
-    party_counts = df['famille_politique'].value_counts()
+    party_counts = aggs['party_counts']
     
     fig = px.sunburst(
         names=party_counts.index,
@@ -176,46 +409,56 @@ def create_party_flow_diagram(df, output_dir):
     fig.update_layout(height=600)
     
     output_path = os.path.join(output_dir, 'party_distribution_sunburst.html')
-    pyo.plot(fig, filename=output_path, auto_open=False)
+    write_figure(fig, output_path)
     return output_path
 
-def create_socioeconomic_scatter(df, output_dir):
-    """Scatter plots interactifs des variables socio-économiques"""
-    print("🎯 Génération: Scatter plots socio-économiques")
+def create_socioeconomic_scatter(aggs, output_dir, max_points=None):
+    """
+    Scatter plots interactifs des variables socio-économiques.
     
-    # Vérification des colonnes disponibles
-    socio_cols = ['population', 'revenu_median_uc_euros', 'taux_chomage_pct', 
-                  'taux_pauvrete_pct', 'turnout_pct']
-    available_cols = [col for col in socio_cols if col in df.columns and df[col].notna().sum() > 10]
+    Les lignes sont agrégées par (commune, année, famille politique) : un point
+    par groupe, de taille proportionnelle au nombre de scrutins. Au-delà de
+    max_points groupes, un échantillon stratifié par famille politique est tracé.
+    """
+    print("🎯 Génération: Scatter plots socio-économiques")
     
-    if len(available_cols) < 2:
+    if aggs['socio'] is None:
         print("⚠️  Pas assez de variables socio-économiques disponibles")
         return None
-    
-    # Création d'un scatter plot avec les deux premières variables disponibles
-    x_var = available_cols[0]
-    y_var = available_cols[1] if len(available_cols) > 1 else available_cols[0]
-    
-    # Filtrage des données valides
-    valid_data = df.dropna(subset=[x_var, y_var, 'famille_politique'])
-    
-    fig = px.scatter(valid_data, 
-                    x=x_var, y=y_var,
-                    color='famille_politique',
-                    size='population' if 'population' in df.columns else None,
-                    hover_name='nom_commune',
-                    hover_data=['annee', 'type_scrutin'],
-                    title=f'Relations {x_var.replace("_", " ")} vs {y_var.replace("_", " ")}',
-                    labels={x_var: x_var.replace("_", " ").title(),
-                           y_var: y_var.replace("_", " ").title()})
+    x_var, y_var, plot_data = aggs['socio']
+    
+    if max_points and len(plot_data) > max_points:
+        frac = max_points / len(plot_data)
+        # Au moins un point par famille : les petites familles restent visibles
+        plot_data = pd.concat([
+            group.sample(n=max(1, round(frac * len(group))), random_state=0)
+            for _, group in plot_data.groupby('famille_politique', observed=True)
+        ])
+        print(f"📉 Échantillon stratifié: {len(plot_data)} points affichés")
+    
+    # Rendu WebGL (un seul appel de dessin GPU au lieu d'un nœud SVG par point)
+    # famille_politique en texte (voir create_interactive_timeline)
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message=_PX_GET_GROUP_WARNING, category=FutureWarning)
+        fig = px.scatter(plot_data.astype({'famille_politique': str}),
+                        x=x_var, y=y_var,
+                        color='famille_politique',
+                        category_orders=_category_orders(plot_data, 'famille_politique'),
+                        size='nb_scrutins',
+                        hover_name='nom_commune',
+                        hover_data=['annee', 'nb_scrutins'],
+                        title=f'Relations {x_var.replace("_", " ")} vs {y_var.replace("_", " ")}',
+                        labels={x_var: x_var.replace("_", " ").title(),
+                               y_var: y_var.replace("_", " ").title()},
+                        render_mode='webgl')
     
     fig.update_layout(height=600)
     
     output_path = os.path.join(output_dir, 'socioeconomic_scatter.html')
-    pyo.plot(fig, filename=output_path, auto_open=False)
+    write_figure(fig, output_path)
     return output_path
 
-def create_electoral_dashboard(df, output_dir):
+def create_electoral_dashboard(aggs, output_dir):
     """Dashboard complet avec plusieurs visualisations"""
     print("🎯 Génération: Dashboard complet")
     
@@ -227,22 +470,29 @@ def create_electoral_dashboard(df, output_dir):
         specs=[[{"secondary_y": False}, {"secondary_y": False}],
                [{"type": "pie"}, {"secondary_y": False}]]
     )
+    # Courbes en WebGL (Scattergl) : rendu GPU, indépendant du nombre de points
     
     # 1. Évolution des familles politiques
-    party_evolution = df.groupby(['annee', 'famille_politique']).size().unstack(fill_value=0)
-    top_parties = party_evolution.sum().nlargest(5).index
-    
-    for party in top_parties:
-        fig.add_trace(
-            go.Scatter(x=party_evolution.index, 
-                      y=party_evolution[party],
-                      mode='lines+markers',
-                      name=party),
-            row=1, col=1
-        )
+    party_evolution = aggs['year_party_counts']
+    # 5 familles les plus fréquentes : sélection partielle puis tri décroissant (égalités : ordre des colonnes)
+    totals = party_evolution.to_numpy().sum(axis=0)
+    k = min(5, len(totals))
+    top = np.argpartition(-totals, k - 1)[:k] if k else np.array([], dtype=int)
+    top_parties = party_evolution.columns[top[np.lexsort((top, -totals[top]))]]
+    
+    # Traces construites d'abord puis ajoutées en un appel, sur tableaux numpy
+    party_years = party_evolution.index.to_numpy()
+    party_traces = [
+        go.Scattergl(x=party_years,
+                  y=party_evolution[party].to_numpy(),
+                  mode='lines+markers',
+                  name=str(party))
+        for party in top_parties
+    ]
+    fig.add_traces(party_traces, rows=1, cols=1)
     
     # 2. Participation par scrutin
-    participation_data = df.groupby('type_scrutin')['turnout_pct'].mean() * 100
+    participation_data = aggs['part_by_type'] * 100
     fig.add_trace(
         go.Bar(x=participation_data.index, 
                y=participation_data.values,
@@ -252,7 +502,7 @@ def create_electoral_dashboard(df, output_dir):
     )
     
     # 3. Distribution des victoires (Pie chart)
-    party_dist = df['famille_politique'].value_counts()
+    party_dist = aggs['party_counts']
     fig.add_trace(
         go.Pie(labels=party_dist.index, 
                values=party_dist.values,
@@ -261,28 +511,20 @@ def create_electoral_dashboard(df, output_dir):
     )
     
     # 4. Tendances temporelles
-    yearly_data = df.groupby('annee').agg({
-        'turnout_pct': 'mean',
-        'blancs_pct': 'mean'
-    }).fillna(0)
-    
-    fig.add_trace(
-        go.Scatter(x=yearly_data.index,
-                  y=yearly_data['turnout_pct'] * 100,
+    yearly_data = aggs['yearly'].fillna(0)
+    years = yearly_data.index.to_numpy()
+    fig.add_traces([
+        go.Scattergl(x=years,
+                  y=yearly_data['turnout_pct'].to_numpy() * 100,
                   mode='lines+markers',
                   name='Participation',
                   line=dict(color='blue')),
-        row=2, col=2
-    )
-    
-    fig.add_trace(
-        go.Scatter(x=yearly_data.index,
-                  y=yearly_data['blancs_pct'] * 100,
+        go.Scattergl(x=years,
+                  y=yearly_data['blancs_pct'].to_numpy() * 100,
                   mode='lines+markers',
                   name='Votes blancs',
                   line=dict(color='red')),
-        row=2, col=2
-    )
+    ], rows=2, cols=2)
     
     # Mise à jour du layout
     fig.update_layout(height=800, 
@@ -290,14 +532,15 @@ def create_electoral_dashboard(df, output_dir):
                      showlegend=True)
     
     output_path = os.path.join(output_dir, 'dashboard_electoral.html')
-    pyo.plot(fig, filename=output_path, auto_open=False)
+    write_figure(fig, output_path)
     return output_path
 
 def create_index_page(output_files, output_dir):
     """Crée une page d'index HTML pour naviguer entre les visualisations"""
     print("📄 Génération de la page d'index")
     
-    html_content = f"""
+    # Morceaux accumulés dans une liste puis assemblés en une fois (pas de += quadratique)
+    parts = [f"""
     <!DOCTYPE html>
     <html lang="fr">
     <head>
@@ -328,7 +571,7 @@ def create_index_page(output_files, output_dir):
             </div>
             
             <div class="grid">
-    """
+    """]
     
     # Descriptions des visualisations
     descriptions = {
@@ -360,24 +603,24 @@ def create_index_page(output_files, output_dir):
             filename = os.path.basename(file_path)
             if filename in descriptions:
                 desc = descriptions[filename]
-                html_content += f"""
+                parts.append(f"""
                 <div class="card">
                     <h3>{desc['title']}</h3>
                     <p>{desc['description']}</p>
                     <a href="{filename}" class="btn">Ouvrir la visualisation</a>
                 </div>
-                """
+                """)
     
-    html_content += """
+    parts.append("""
             </div>
         </div>
     </body>
     </html>
-    """
+    """)
+    html_content = ''.join(parts)
     
     index_path = os.path.join(output_dir, 'index.html')
-    with open(index_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    write_bytes(index_path, html_content.encode('utf-8'))
     
     return index_path
 
@@ -392,6 +635,12 @@ def main():
                        help="Chemin vers le fichier de données")
     parser.add_argument("--output", default="/app/reports/interactive",
                        help="Répertoire de sortie pour le dashboard")
+    parser.add_argument("--max-points", type=int,
+                       help="Nombre maximal de points du scatter socio-économique (échantillon stratifié)")
+    parser.add_argument("--jobs", type=int, default=-1,
+                       help="Nombre de processus pour générer les figures (-1 = tous les cœurs)")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Recalculer les agrégats sans lire ni écrire le cache")
     
     args = parser.parse_args()
     
@@ -399,20 +648,26 @@ def main():
     os.makedirs(args.output, exist_ok=True)
     print(f"📁 Répertoire de sortie: {args.output}")
     
-    # Chargement des données
-    df = load_data(args.data)
-    
-    # Génération des visualisations interactives
-    output_files = []
-    
-    # Dashboard principal
-    output_files.append(create_electoral_dashboard(df, args.output))
-    
-    # Visualisations individuelles
-    output_files.append(create_interactive_timeline(df, args.output))
-    output_files.append(create_participation_heatmap(df, args.output))
-    output_files.append(create_party_flow_diagram(df, args.output))
-    output_files.append(create_socioeconomic_scatter(df, args.output))
+    # Chargement des données et agrégats partagés, calculés une seule fois
+    aggs = load_aggregates(args.data, args.output, use_cache=not args.no_cache)
+    
+    # plotly.js partagé écrit une seule fois, avant que les processus ne génèrent les pages
+    bundle_path = os.path.join(args.output, 'plotly.min.js')
+    if not os.path.exists(bundle_path):
+        write_bytes(bundle_path, get_plotlyjs().encode('utf-8'))
+    
+    # Génération des visualisations interactives : figures indépendantes, une par processus
+    builders = [
+        (create_electoral_dashboard, ()),  # Dashboard principal
+        (create_interactive_timeline, ()),
+        (create_participation_heatmap, ()),
+        (create_party_flow_diagram, ()),
+        (create_socioeconomic_scatter, (args.max_points,)),
+    ]
+    n_jobs = max(1, min(effective_n_jobs(args.jobs), len(builders)))
+    output_files = Parallel(n_jobs=n_jobs, backend='loky')(
+        delayed(builder)(aggs, args.output, *extra) for builder, extra in builders
+    )
     
     # Page d'index
     index_file = create_index_page(output_files, args.output)
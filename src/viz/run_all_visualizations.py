@@ -28,67 +28,226 @@ Date: 2024-2025
 """
 
 import argparse
+import asyncio
 import os
 import sys
-import subprocess
 import json
+from collections import deque
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
-def run_command(command, description):
+try:
+    # Sérialisation JSON en C (optionnelle)
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # Conversion unique du CSV en fichier Arrow partagé (optionnelle)
+    import pyarrow.csv as pa_csv
+    import pyarrow.feather as pa_feather
+except ImportError:
+    pa_csv = None
+
+# Nombre de dernières lignes de sortie conservées par module (message d'erreur)
+OUTPUT_TAIL_LINES = 20
+
+async def run_command(command, description, label=None):
     """
     Exécute une commande système avec gestion d'erreurs robuste.
     
     Cette fonction encapsule l'exécution de sous-processus avec :
-    - Capture et affichage des sorties standard et d'erreur
+    - Affichage en continu des sorties standard et d'erreur
     - Gestion des codes de retour non-zéro
     - Logging détaillé pour le debugging
     - Tolérance aux erreurs pour permettre l'exécution partielle
     
+    Coroutine : le sous-processus est lancé sans bloquer la boucle asyncio,
+    ce qui permet d'exécuter plusieurs modules en parallèle. Sa sortie est
+    relayée ligne à ligne au fil de l'exécution (préfixée par label) au lieu
+    d'être accumulée en mémoire jusqu'à la fin ; seules les dernières lignes
+    sont conservées pour le message d'erreur.
+    
     Args:
         command (list): Liste des arguments de la commande à exécuter
         description (str): Description humaine de l'opération
+        label (str, optional): Préfixe des lignes relayées (nom du module)
         
     Returns:
         tuple: (success: bool, output: str) 
                - success: True si la commande a réussi
-               - output: Sortie standard ou message d'erreur
+               - output: Dernières lignes de sortie ou message d'erreur
     """
     print(f"\n🔄 {description}")
     print(f"💻 Commande: {' '.join(command)}")
     
     try:
-        result = subprocess.run(command, check=True, capture_output=True, text=True)
-        print(f"✅ {description} - Terminé avec succès")
-        if result.stdout.strip():
-            print("📋 Sortie:")
-            print(result.stdout)
-        return True, result.stdout
-    except subprocess.CalledProcessError as e:
-        print(f"❌ {description} - Erreur")
-        print(f"Code de retour: {e.returncode}")
-        if e.stderr:
-            print(f"Erreur: {e.stderr}")
-        if e.stdout:
-            print(f"Sortie: {e.stdout}")
-        return False, e.stderr
+        # PYTHONUNBUFFERED : les scripts Python enfants écrivent ligne à ligne dans le tube
+        proc = await asyncio.create_subprocess_exec(
+            *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+            env={**os.environ, 'PYTHONUNBUFFERED': '1'})
     except FileNotFoundError:
         print(f"❌ {description} - Script non trouvé")
         return False, "Script non trouvé"
+    
+    prefix = f"  │ [{label}] " if label else "  │ "
+    tail = deque(maxlen=OUTPUT_TAIL_LINES)
+    async for raw_line in proc.stdout:
+        line = raw_line.decode('utf-8', errors='replace').rstrip()
+        tail.append(line)
+        print(f"{prefix}{line}", flush=True)
+    returncode = await proc.wait()
+    output = "\n".join(tail)
+    
+    if returncode == 0:
+        print(f"✅ {description} - Terminé avec succès")
+        return True, output
+    
+    print(f"❌ {description} - Erreur")
+    print(f"Code de retour: {returncode}")
+    return False, output
 
-def create_master_index(output_base_dir):
-    """Crée une page d'index maître pour toutes les visualisations"""
-    print("📄 Génération de l'index maître")
+def write_json(data, path):
+    """Écrit data en JSON indenté (UTF-8 lisible) : orjson si disponible, sinon module json"""
+    if orjson is not None:
+        Path(path).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+def prepare_shared_data(data_path, output_dir):
+    """
+    Convertit une seule fois le CSV maître en fichier Feather (Arrow) partagé.
     
-    # Collecte des répertoires de visualisation
-    viz_dirs = {
-        'trends': 'Analyses de Tendances',
-        'interactive': 'Dashboard Interactif', 
-        'geographic': 'Analyses Géographiques',
-        'checks': 'Audits et Vérifications'
-    }
+    Les modules lancés ensuite lisent ce fichier en colonnes au lieu de
+    re-parser chacun le CSV. Le fichier output_dir/_master.feather est
+    réutilisé tant qu'il est plus récent que le CSV.
+    
+    Args:
+        data_path (str): Chemin du CSV source
+        output_dir (str): Répertoire de base des sorties
+        
+    Returns:
+        str: Chemin à transmettre aux modules via --data (le CSV si pyarrow est absent)
+    """
+    if pa_csv is None or not os.path.exists(data_path):
+        return data_path
+    
+    shared_path = os.path.join(output_dir, '_master.feather')
+    if os.path.exists(shared_path) and os.path.getmtime(shared_path) >= os.path.getmtime(data_path):
+        return shared_path
+    
+    try:
+        # Champs vides lus comme valeurs manquantes, comme pd.read_csv
+        table = pa_csv.read_csv(data_path,
+                                convert_options=pa_csv.ConvertOptions(strings_can_be_null=True))
+        pa_feather.write_feather(table, shared_path)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Fichier Arrow partagé non créé ({e}), lecture du CSV par chaque module")
+        return data_path
     
-    html_content = f"""
+    print(f"⚡ Données converties une fois pour tous les modules: {shared_path}")
+    return shared_path
+
+async def run_modules(commands):
+    """
+    Lance en parallèle les modules indépendants et attend leur fin.
+    
+    Args:
+        commands (dict): {module: (commande, description)}
+        
+    Returns:
+        dict: {module: succès (bool)}, dans l'ordre de commands
+    """
+    outcomes = await asyncio.gather(
+        *(run_command(command, description, label=module)
+          for module, (command, description) in commands.items()),
+        return_exceptions=True
+    )
+    results = {}
+    for module, outcome in zip(commands, outcomes):
+        if isinstance(outcome, BaseException):
+            print(f"❌ {module.capitalize()} - Exception: {outcome}")
+            results[module] = False
+        else:
+            results[module] = outcome[0]
+    return results
+
+# Fichier témoin de chaque répertoire de module : mtime des données au dernier succès
+STAMP_FILE = '.stamp'
+# Sorties complètes des modules pouvant être ignorés quand elles sont à jour, dans leur
+# répertoire (MODULE_DIRS). Absents, donc toujours relancés : les analyses géographiques
+# et les prédictions, dont les fichiers dépendent des élections présentes et de --years
+MODULE_OUTPUTS = {
+    'audit': ['winner_variation.csv'],
+    'trends': ['evolution_familles_politiques.png', 'evolution_participation.png',
+               'tendances_socioeconomiques.png', 'matrice_correlation.png',
+               'comparaison_scrutins.png', 'rapport_synthese.json', 'rapport_synthese.txt'],
+    'interactive': ['index.html', 'dashboard_electoral.html', 'timeline_interactive.html',
+                    'participation_heatmap.html', 'socioeconomic_scatter.html',
+                    'party_distribution_sunburst.html', 'plotly.min.js'],
+}
+# Répertoire de sortie des modules, s'il diffère du nom du module
+MODULE_DIRS = {'audit': 'checks'}
+
+def is_up_to_date(module_dir, data_mtime, expected_files):
+    """
+    Indique si les sorties d'un module sont à jour vis-à-vis des données.
+    
+    Args:
+        module_dir (str): Répertoire de sortie du module
+        data_mtime (float): Date de modification du CSV source
+        expected_files (list): Fichiers attendus dans module_dir (vide : jamais à jour)
+        
+    Returns:
+        bool: True si le témoin est au moins aussi récent que les données et
+        que tous les fichiers attendus existent
+    """
+    if not expected_files:
+        return False
+    try:
+        stamp = float(Path(module_dir, STAMP_FILE).read_text())
+    except (OSError, ValueError):
+        return False
+    return stamp >= data_mtime and all(os.path.exists(os.path.join(module_dir, f))
+                                       for f in expected_files)
+
+def write_stamp(module_dir, data_mtime):
+    """Enregistre le mtime des données traitées dans le témoin du module"""
+    os.makedirs(module_dir, exist_ok=True)
+    Path(module_dir, STAMP_FILE).write_text(repr(data_mtime))
+
+# Modules présentés dans l'index maître : icône, titre, description et fichiers attendus
+MASTER_INDEX_MODULES = {
+    'trends': {
+        'icon': '📈',
+        'title': 'Analyses de Tendances',
+        'description': 'Évolution temporelle des familles politiques, participation électorale, corrélations socio-économiques et comparaisons entre types de scrutin.',
+        'files': ['evolution_familles_politiques.png', 'evolution_participation.png', 'rapport_synthese.txt']
+    },
+    'interactive': {
+        'icon': '🎯', 
+        'title': 'Dashboard Interactif',
+        'description': 'Visualisations interactives avec Plotly : timeline, heatmaps, scatter plots et dashboard complet navigable dans votre navigateur.',
+        'files': ['index.html', 'dashboard_electoral.html']
+    },
+    'geographic': {
+        'icon': '🗺️',
+        'title': 'Analyses Géographiques', 
+        'description': 'Cartes choroplèthes des résultats électoraux, analyse de participation par commune et comparaisons géographiques multi-temporelles.',
+        'files': ['evolution_presidentielles_comparison.png', 'analyse_stabilite_communes.csv']
+    },
+    'checks': {
+        'icon': '🔍',
+        'title': 'Audits & Vérifications',
+        'description': 'Contrôles qualité des données, vérification de la cohérence des résultats et validation des calculs de vainqueurs par commune.',
+        'files': ['winner_variation.csv']
+    }
+}
+
+# Parties statiques de l'index maître (en-tête + CSS, pied de page), sans interpolation
+_STATIC_HEAD = """
     <!DOCTYPE html>
     <html lang="fr">
     <head>
@@ -96,37 +255,37 @@ def create_master_index(output_base_dir):
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
         <title>Centre d'Analyse Électorale - Nantes Métropole</title>
         <style>
-            * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-            body {{ 
+            * { margin: 0; padding: 0; box-sizing: border-box; }
+            body { 
                 font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; 
                 background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
                 min-height: 100vh;
                 padding: 20px;
-            }}
-            .container {{ 
+            }
+            .container { 
                 max-width: 1200px; 
                 margin: 0 auto; 
                 background: white; 
                 border-radius: 20px; 
                 box-shadow: 0 20px 40px rgba(0,0,0,0.1);
                 overflow: hidden;
-            }}
-            .header {{ 
+            }
+            .header { 
                 background: linear-gradient(135deg, #2c3e50 0%, #34495e 100%);
                 color: white; 
                 padding: 40px; 
                 text-align: center; 
-            }}
-            .header h1 {{ font-size: 2.5rem; margin-bottom: 10px; }}
-            .header p {{ font-size: 1.1rem; opacity: 0.9; }}
-            .content {{ padding: 40px; }}
-            .grid {{ 
+            }
+            .header h1 { font-size: 2.5rem; margin-bottom: 10px; }
+            .header p { font-size: 1.1rem; opacity: 0.9; }
+            .content { padding: 40px; }
+            .grid { 
                 display: grid; 
                 grid-template-columns: repeat(auto-fit, minmax(280px, 1fr)); 
                 gap: 30px; 
                 margin-top: 30px; 
-            }}
-            .card {{ 
+            }
+            .card { 
                 background: white; 
                 border: 1px solid #e1e8ed;
                 border-radius: 15px; 
@@ -135,8 +294,8 @@ def create_master_index(output_base_dir):
                 transition: transform 0.3s ease, box-shadow 0.3s ease;
                 position: relative;
                 overflow: hidden;
-            }}
-            .card::before {{
+            }
+            .card::before {
                 content: '';
                 position: absolute;
                 top: 0;
@@ -144,27 +303,27 @@ def create_master_index(output_base_dir):
                 right: 0;
                 height: 4px;
                 background: linear-gradient(90deg, #3498db, #9b59b6);
-            }}
-            .card:hover {{ 
+            }
+            .card:hover { 
                 transform: translateY(-5px); 
                 box-shadow: 0 15px 35px rgba(0,0,0,0.15);
-            }}
-            .card-icon {{ 
+            }
+            .card-icon { 
                 font-size: 3rem; 
                 margin-bottom: 20px; 
                 display: block; 
-            }}
-            .card h3 {{ 
+            }
+            .card h3 { 
                 color: #2c3e50; 
                 font-size: 1.4rem; 
                 margin-bottom: 15px; 
-            }}
-            .card p {{ 
+            }
+            .card p { 
                 color: #7f8c8d; 
                 line-height: 1.6; 
                 margin-bottom: 20px; 
-            }}
-            .btn {{ 
+            }
+            .btn { 
                 display: inline-block; 
                 background: linear-gradient(135deg, #3498db, #2980b9); 
                 color: white; 
@@ -173,43 +332,43 @@ def create_master_index(output_base_dir):
                 border-radius: 8px; 
                 font-weight: 600;
                 transition: all 0.3s ease;
-            }}
-            .btn:hover {{ 
+            }
+            .btn:hover { 
                 transform: translateY(-2px);
                 box-shadow: 0 5px 15px rgba(52, 152, 219, 0.4);
-            }}
-            .stats {{ 
+            }
+            .stats { 
                 background: #f8f9fa; 
                 padding: 25px; 
                 border-radius: 10px; 
                 margin-bottom: 30px;
                 border-left: 4px solid #3498db;
-            }}
-            .stats-grid {{
+            }
+            .stats-grid {
                 display: grid;
                 grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
                 gap: 20px;
-            }}
-            .stat-item {{
+            }
+            .stat-item {
                 text-align: center;
-            }}
-            .stat-number {{
+            }
+            .stat-number {
                 font-size: 2rem;
                 font-weight: bold;
                 color: #3498db;
                 display: block;
-            }}
-            .stat-label {{
+            }
+            .stat-label {
                 color: #7f8c8d;
                 font-size: 0.9rem;
-            }}
-            .footer {{
+            }
+            .footer {
                 background: #2c3e50;
                 color: white;
                 text-align: center;
                 padding: 20px;
                 opacity: 0.8;
-            }}
+            }
         </style>
     </head>
     <body>
@@ -219,7 +378,23 @@ def create_master_index(output_base_dir):
                 <p>Nantes Métropole • Analyses et Visualisations Interactives</p>
             </div>
             
-            <div class="content">
+"""
+
+_STATIC_FOOTER = """
+                </div>
+            </div>
+            
+            <div class="footer">
+                <p>Généré automatiquement par le système d'analyse électorale • Claude Code</p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+
+def _render_stats_block(update_date):
+    """Bloc d'informations de l'index maître, jusqu'à l'ouverture de la grille des modules"""
+    return f"""            <div class="content">
                 <div class="stats">
                     <h3>📊 Informations sur l'analyse</h3>
                     <div class="stats-grid">
@@ -236,7 +411,7 @@ def create_master_index(output_base_dir):
                             <span class="stat-label">Période couverte</span>
                         </div>
                         <div class="stat-item">
-                            <span class="stat-number">{datetime.now().strftime('%d/%m/%Y')}</span>
+                            <span class="stat-number">{update_date}</span>
                             <span class="stat-label">Dernière mise à jour</span>
                         </div>
                     </div>
@@ -244,76 +419,47 @@ def create_master_index(output_base_dir):
                 
                 <div class="grid">
     """
-    
-    # Configuration des modules avec leurs descriptions
-    modules = {
-        'trends': {
-            'icon': '📈',
-            'title': 'Analyses de Tendances',
-            'description': 'Évolution temporelle des familles politiques, participation électorale, corrélations socio-économiques et comparaisons entre types de scrutin.',
-            'files': ['evolution_familles_politiques.png', 'evolution_participation.png', 'rapport_synthese.txt']
-        },
-        'interactive': {
-            'icon': '🎯', 
-            'title': 'Dashboard Interactif',
-            'description': 'Visualisations interactives avec Plotly : timeline, heatmaps, scatter plots et dashboard complet navigable dans votre navigateur.',
-            'files': ['index.html', 'dashboard_electoral.html']
-        },
-        'geographic': {
-            'icon': '🗺️',
-            'title': 'Analyses Géographiques', 
-            'description': 'Cartes choroplèthes des résultats électoraux, analyse de participation par commune et comparaisons géographiques multi-temporelles.',
-            'files': ['evolution_presidentielles_comparison.png', 'analyse_stabilite_communes.csv']
-        },
-        'checks': {
-            'icon': '🔍',
-            'title': 'Audits & Vérifications',
-            'description': 'Contrôles qualité des données, vérification de la cohérence des résultats et validation des calculs de vainqueurs par commune.',
-            'files': ['winner_variation.csv']
-        }
-    }
-    
-    for dir_name, module_info in modules.items():
-        module_path = os.path.join(output_base_dir, dir_name)
-        
-        # Vérification de l'existence des fichiers
-        files_exist = []
-        if os.path.exists(module_path):
-            for file_name in module_info['files']:
-                file_path = os.path.join(module_path, file_name)
-                if os.path.exists(file_path):
-                    files_exist.append(file_name)
-        
-        status = "✅ Disponible" if files_exist else "⏳ En cours"
-        files_count = len(files_exist)
-        
-        html_content += f"""
+
+@lru_cache(maxsize=64)
+def _render_card(dir_name, title, icon, description, files_count, status):
+    """Carte HTML d'un module (mise en cache : mêmes arguments, même fragment)"""
+    return f"""
                     <div class="card">
-                        <span class="card-icon">{module_info['icon']}</span>
-                        <h3>{module_info['title']}</h3>
-                        <p>{module_info['description']}</p>
+                        <span class="card-icon">{icon}</span>
+                        <h3>{title}</h3>
+                        <p>{description}</p>
                         <p><strong>Status:</strong> {status} • <strong>Fichiers:</strong> {files_count}</p>
                         <a href="{dir_name}/index.html" class="btn" target="_blank">
                             Ouvrir l'analyse
                         </a>
                     </div>
         """
+
+def _card_for(dir_name, module_info, output_base_dir):
+    """Carte d'un module selon les fichiers attendus présents dans son répertoire"""
+    module_path = Path(output_base_dir, dir_name)
     
-    html_content += """
-                </div>
-            </div>
-            
-            <div class="footer">
-                <p>Généré automatiquement par le système d'analyse électorale • Claude Code</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
+    # Vérification de l'existence des fichiers : une seule lecture du répertoire
+    present = {f.name for f in module_path.iterdir()} if module_path.is_dir() else set()
+    files_exist = [file_name for file_name in module_info['files'] if file_name in present]
+    
+    status = "✅ Disponible" if files_exist else "⏳ En cours"
+    return _render_card(dir_name, module_info['title'], module_info['icon'],
+                        module_info['description'], len(files_exist), status)
+
+def create_master_index(output_base_dir):
+    """Crée une page d'index maître pour toutes les visualisations"""
+    print("📄 Génération de l'index maître")
+    
+    # Parties statiques en constantes ; seuls la date et l'état des modules sont rendus
+    parts = [_STATIC_HEAD, _render_stats_block(datetime.now().strftime('%d/%m/%Y'))]
+    parts.extend(_card_for(dir_name, module_info, output_base_dir)
+                 for dir_name, module_info in MASTER_INDEX_MODULES.items())
+    parts.append(_STATIC_FOOTER)
     
+    # Page assemblée en une chaîne, écrite en une fois
     index_path = os.path.join(output_base_dir, 'index.html')
-    with open(index_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    Path(index_path).write_text("".join(parts), encoding='utf-8')
     
     return index_path
 
@@ -329,6 +475,8 @@ def main():
     parser.add_argument("--skip-geographic", action="store_true", help="Ignorer l'analyse géographique")
     parser.add_argument("--skip-audit", action="store_true", help="Ignorer l'audit des données")
     parser.add_argument("--skip-predictions", action="store_true", help="Ignorer les prédictions futures")
+    parser.add_argument("--force", action="store_true",
+                       help="Relancer tous les modules même si leurs sorties sont à jour")
     
     args = parser.parse_args()
     
@@ -339,53 +487,82 @@ def main():
     # Création du répertoire de base
     os.makedirs(args.output, exist_ok=True)
     
-    # Suivi des résultats
-    results = {}
+    # CSV parsé une seule fois, fichier Arrow transmis aux modules
+    shared_data = prepare_shared_data(args.data, args.output)
+    
+    # Modules à exécuter : indépendants les uns des autres, lancés en parallèle
+    commands = {}
     
     # 1. Audit des données (si pas ignoré)
     if not args.skip_audit:
-        success, output = run_command([
-            'python', '/app/src/audit_winner.py'
+        commands['audit'] = ([
+            'python', '/app/src/audit_winner.py',
+            '--data', args.data,
+            '--output', os.path.join(args.output, 'checks')
         ], "Audit de cohérence des données")
-        results['audit'] = success
     
     # 2. Analyse des tendances (si pas ignoré)
     if not args.skip_trends:
-        success, output = run_command([
+        commands['trends'] = ([
             'python', '/app/src/viz/trends_analyzer.py',
-            '--data', args.data,
+            '--data', shared_data,
             '--output', os.path.join(args.output, 'trends')
         ], "Génération des analyses de tendances")
-        results['trends'] = success
     
     # 3. Dashboard interactif (si pas ignoré)
     if not args.skip_interactive:
-        success, output = run_command([
+        commands['interactive'] = ([
             'python', '/app/src/viz/interactive_dashboard.py',
-            '--data', args.data,
+            '--data', shared_data,
             '--output', os.path.join(args.output, 'interactive')
         ], "Génération du dashboard interactif")
-        results['interactive'] = success
     
     # 4. Analyse géographique (si pas ignoré) 
     if not args.skip_geographic:
-        success, output = run_command([
+        commands['geographic'] = ([
             'python', '/app/src/viz/geographic_analyzer.py',
-            '--data', args.data,
+            '--data', shared_data,
             '--output', os.path.join(args.output, 'geographic'),
             '--all-elections'
         ], "Génération des analyses géographiques")
-        results['geographic'] = success
     
     # 5. Prédictions futures (si pas ignoré)
     if not args.skip_predictions:
-        success, output = run_command([
+        commands['predictions'] = ([
             'python', '/app/src/viz/future_predictions.py',
-            '--data', args.data,
+            '--data', shared_data,
             '--output', os.path.join(args.output, 'predictions'),
             '--years', '2025', '2026', '2027'
         ], "Génération des prédictions futures")
-        results['predictions'] = success
+    
+    # Modules lancés simultanément : chacun reçoit sa part des cœurs pour son pool
+    # de processus, au lieu d'un pool par module dimensionné sur toute la machine
+    jobs_per_module = str(max(1, (os.cpu_count() or 1) // max(1, len(commands))))
+    for module, (command, description) in commands.items():
+        # Seuls ces modules répartissent leur travail entre processus ; l'audit et les
+        # tendances sont séquentiels, les prédictions aussi par défaut (pool plus lent que le calcul)
+        if module in ('interactive', 'geographic'):
+            command.extend(['--jobs', jobs_per_module])
+    
+    # Modules à jour (données inchangées, sorties présentes) : pas de relance
+    data_mtime = os.stat(args.data).st_mtime if os.path.exists(args.data) else None
+    skipped = set()
+    if not args.force and data_mtime is not None:
+        for module in commands:
+            if is_up_to_date(os.path.join(args.output, MODULE_DIRS.get(module, module)), data_mtime,
+                             MODULE_OUTPUTS.get(module, [])):
+                print(f"⏭️  {commands[module][1]} - Sorties à jour, module ignoré")
+                skipped.add(module)
+    
+    # Suivi des résultats (durée totale ≈ celle du module le plus long)
+    outcomes = asyncio.run(run_modules({module: command for module, command in commands.items()
+                                        if module not in skipped}))
+    results = {module: outcomes.get(module, True) for module in commands}
+    
+    if data_mtime is not None:
+        for module, success in outcomes.items():
+            if success and module in MODULE_OUTPUTS:
+                write_stamp(os.path.join(args.output, MODULE_DIRS.get(module, module)), data_mtime)
     
     # 6. Génération de l'index maître
     index_file = create_master_index(args.output)
@@ -418,8 +595,7 @@ def main():
     }
     
     report_path = os.path.join(args.output, 'generation_report.json')
-    with open(report_path, 'w', encoding='utf-8') as f:
-        json.dump(report_data, f, indent=2, ensure_ascii=False)
+    write_json(report_data, report_path)
     
     print(f"📊 Rapport détaillé: {os.path.basename(report_path)}")
     
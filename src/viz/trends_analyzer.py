@@ -45,22 +45,41 @@ Date: 2024-2025
 """
 
 import argparse
+import json
 import os
 import sys
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+import matplotlib.font_manager as font_manager
 import seaborn as sns
 from datetime import datetime
 from pathlib import Path
 
+try:
+    # Sérialisation JSON en C (optionnelle)
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configuration matplotlib pour Docker
 plt.switch_backend('Agg')  # Backend non-interactif
 plt.style.use('default')
 
-def setup_matplotlib():
-    """Configure matplotlib pour un rendu optimal"""
+# Variables de la matrice de corrélation (ordre d'affichage), retenues si présentes
+CORRELATION_COLUMNS = ('turnout_pct', 'abstention_pct', 'blancs_pct', 'nuls_pct', 'population',
+                       'revenu_median_uc_euros', 'taux_chomage_pct', 'taux_pauvrete_pct',
+                       'delinquance_pour_1000_hab')
+# Indicateurs socio-économiques suivis dans le temps, retenus si présents
+SOCIO_COLUMNS = ('population', 'revenu_median_uc_euros', 'taux_chomage_pct',
+                 'taux_pauvrete_pct', 'delinquance_pour_1000_hab')
+# Seules colonnes de master_ml.csv lues : graphiques et rapport de synthèse
+USED_COLUMNS = frozenset(('annee', 'date_scrutin', 'famille_politique', 'type_scrutin',
+                          'code_commune_insee', 'turnout_pct') + SOCIO_COLUMNS + CORRELATION_COLUMNS)
+
+def setup_matplotlib(dpi=150):
+    """Configure matplotlib pour un rendu optimal (dpi : résolution des PNG exportés)"""
     plt.rcParams.update({
         'figure.figsize': [12, 8],
         'font.size': 10,
@@ -70,29 +89,83 @@ def setup_matplotlib():
         'ytick.labelsize': 10,
         'legend.fontsize': 10,
         'figure.dpi': 150,
-        'savefig.dpi': 300,
+        'savefig.dpi': dpi,
         'savefig.bbox': 'tight',
         'axes.grid': True,
         'grid.alpha': 0.3
     })
+    # Résolution de la police par défaut dès la configuration (findfont est mis en cache) :
+    # le premier graphique ne paie plus la recherche dans les répertoires de polices
+    font_manager.findfont(font_manager.FontProperties(family=plt.rcParams['font.family']))
+
+def write_json(data, path):
+    """Écrit data en JSON indenté (UTF-8 lisible) : orjson si disponible, sinon module json"""
+    if orjson is not None:
+        Path(path).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+# Figure réutilisée d'un graphique à l'autre dans un même processus (voir get_figure)
+_FIGURE = None
+
+def get_figure(figsize):
+    """
+    Retourne la figure partagée du processus, vidée et redimensionnée.
+    
+    Créée au premier appel puis réutilisée via fig.clear() : les graphiques
+    suivants évitent la construction d'une nouvelle figure (rcParams,
+    polices, canvas). Les marges sont remises aux valeurs par défaut, que
+    tight_layout a pu modifier. La figure devient la figure courante de pyplot
+    (recréée si elle a été fermée entre-temps).
+    """
+    global _FIGURE
+    if _FIGURE is None or not plt.fignum_exists(_FIGURE.number):
+        _FIGURE = plt.figure(figsize=figsize)
+    else:
+        _FIGURE.clear()
+        _FIGURE.set_size_inches(figsize)
+        _FIGURE.subplots_adjust(**{k: plt.rcParams[f'figure.subplot.{k}']
+                                   for k in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')})
+        plt.figure(_FIGURE.number)
+    return _FIGURE
 
 def load_data(filepath):
     """Charge et prépare les données"""
     print(f"Chargement des données depuis {filepath}")
     
     try:
-        df = pd.read_csv(filepath)
+        if filepath.endswith('.feather'):
+            # Fichier Arrow partagé préparé par run_all_visualizations (lecture en colonnes)
+            df = pd.read_feather(filepath)
+            df = df[[col for col in df.columns if col in USED_COLUMNS]]
+        else:
+            # Colonnes utiles seulement, dates analysées dès la lecture
+            df = pd.read_csv(filepath, usecols=lambda col: col in USED_COLUMNS,
+                             parse_dates=['date_scrutin'])
     except FileNotFoundError:
         print(f"❌ Fichier non trouvé: {filepath}")
         sys.exit(1)
     
-    # Conversion des types
+    # Conversion des types (déjà typés depuis le CSV : sans effet, utile pour le .feather)
     df['annee'] = pd.to_numeric(df['annee'], errors='coerce')
     df['date_scrutin'] = pd.to_datetime(df['date_scrutin'], errors='coerce')
     
     # Nettoyage
     df = df.dropna(subset=['annee', 'famille_politique'])
-    df = df[df['famille_politique'].astype(str).str.strip() != '']
+    
+    # Colonnes texte répétitives en category : codes entiers pour groupby/value_counts
+    category_cols = ('famille_politique', 'type_scrutin', 'code_commune_insee')
+    for col in category_cols:
+        df[col] = df[col].astype('category')
+    
+    # Familles vides (espaces seuls) : strip sur les seules catégories distinctes, pas ligne à ligne
+    parties = df['famille_politique'].cat.categories
+    blank = parties[parties.astype(str).str.strip() == '']
+    if len(blank):
+        df = df[~df['famille_politique'].isin(blank)].copy()
+        for col in category_cols:
+            df[col] = df[col].cat.remove_unused_categories()
     
     print(f"✅ Données chargées: {len(df)} lignes, {len(df.columns)} colonnes")
     print(f"Période: {df['annee'].min():.0f} - {df['annee'].max():.0f}")
@@ -100,21 +173,39 @@ def load_data(filepath):
     
     return df
 
-def plot_party_evolution(df, output_dir):
-    """Évolution temporelle des familles politiques"""
-    print("📊 Génération: Évolution des familles politiques")
+def compute_party_ranking(df, n=8):
+    """
+    Les n familles politiques ayant gagné le plus de scrutins communaux, par ordre décroissant.
+    
+    Les ex aequo sont départagés par ordre de première apparition dans les
+    données (ordre de value_counts sur une colonne texte), et non par l'ordre
+    alphabétique des catégories : le classement est stable d'une exécution à l'autre.
+    """
+    parties = df['famille_politique'].cat
+    codes = parties.codes.to_numpy()
+    codes = codes[codes >= 0]
+    counts = np.bincount(codes, minlength=len(parties.categories))
+    seen = pd.unique(codes)  # Codes dans l'ordre de première apparition
+    order = seen[np.argsort(-counts[seen], kind='stable')][:n]
+    return tuple(parties.categories[order])
+
+def plot_party_evolution(df, output_dir, top=None):
+    """
+    Évolution temporelle des familles politiques.
     
-    # Agrégation par année et famille politique
-    party_counts = df.groupby(['annee', 'famille_politique']).size().unstack(fill_value=0)
+    top : classement des familles (compute_party_ranking), calculé une
+    fois dans main() et partagé avec plot_scrutin_comparison.
+    """
+    print("📊 Génération: Évolution des familles politiques")
     
-    # Calcul des pourcentages
-    party_pcts = party_counts.div(party_counts.sum(axis=1), axis=0) * 100
+    # Pourcentages par année et famille politique : comptage et normalisation en un passage
+    party_pcts = pd.crosstab(df['annee'], df['famille_politique'], normalize='index').mul(100)
     
     # Plot
-    plt.figure(figsize=(14, 8))
+    fig = get_figure((14, 8))
     
     # Sélection des principales familles politiques
-    top_parties = party_pcts.sum().sort_values(ascending=False).head(8).index
+    top_parties = list(top if top is not None else compute_party_ranking(df))
     
     for party in top_parties:
         plt.plot(party_pcts.index, party_pcts[party], marker='o', linewidth=2, label=party)
@@ -127,8 +218,7 @@ def plot_party_evolution(df, output_dir):
     plt.xticks(party_pcts.index)
     
     output_path = os.path.join(output_dir, 'evolution_familles_politiques.png')
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    plt.close()
+    fig.savefig(output_path, bbox_inches='tight')
     
     return output_path
 
@@ -137,15 +227,18 @@ def plot_turnout_evolution(df, output_dir):
     print("📊 Génération: Évolution de la participation")
     
     # Calcul de la participation moyenne par année et type de scrutin
-    turnout_data = df.groupby(['annee', 'type_scrutin'])['turnout_pct'].mean().reset_index()
+    turnout_data = df.groupby(['annee', 'type_scrutin'], observed=True)['turnout_pct'].mean().reset_index()
     
-    plt.figure(figsize=(14, 8))
+    fig = get_figure((14, 8))
     
-    # Plot par type de scrutin
-    for scrutin in turnout_data['type_scrutin'].unique():
-        data = turnout_data[turnout_data['type_scrutin'] == scrutin]
-        plt.plot(data['annee'], data['turnout_pct'] * 100, 
-                marker='o', linewidth=2, label=scrutin.title(), markersize=8)
+    # Plot par type de scrutin, avec la valeur sur chaque point (un seul passage sur les groupes)
+    for scrutin, grp in turnout_data.groupby('type_scrutin', sort=False, observed=True):
+        x = grp['annee'].to_numpy()
+        y = grp['turnout_pct'].to_numpy() * 100
+        plt.plot(x, y, marker='o', linewidth=2, label=scrutin.title(), markersize=8)
+        for xi, yi in zip(x, y):
+            plt.annotate(f"{yi:.1f}%", (xi, yi),
+                        textcoords="offset points", xytext=(0,10), ha='center')
     
     plt.title('Évolution de la participation électorale par type de scrutin', fontsize=16, pad=20)
     plt.xlabel('Année')
@@ -154,33 +247,24 @@ def plot_turnout_evolution(df, output_dir):
     plt.grid(True, alpha=0.3)
     plt.ylim(0, 100)
     
-    # Ajout des valeurs sur les points
-    for scrutin in turnout_data['type_scrutin'].unique():
-        data = turnout_data[turnout_data['type_scrutin'] == scrutin]
-        for _, row in data.iterrows():
-            plt.annotate(f"{row['turnout_pct']*100:.1f}%", 
-                        (row['annee'], row['turnout_pct']*100),
-                        textcoords="offset points", xytext=(0,10), ha='center')
-    
     output_path = os.path.join(output_dir, 'evolution_participation.png')
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    plt.close()
+    fig.savefig(output_path, bbox_inches='tight')
     
     return output_path
 
-def plot_scrutin_comparison(df, output_dir):
-    """Comparaison des résultats par type de scrutin"""
+def plot_scrutin_comparison(df, output_dir, top=None):
+    """Comparaison des résultats par type de scrutin (top : voir plot_party_evolution)"""
     print("📊 Génération: Comparaison par type de scrutin")
     
     # Agrégation par type de scrutin et famille politique
-    scrutin_data = df.groupby(['type_scrutin', 'famille_politique']).size().unstack(fill_value=0)
+    scrutin_data = df.groupby(['type_scrutin', 'famille_politique'], observed=True).size().unstack(fill_value=0)
     scrutin_pcts = scrutin_data.div(scrutin_data.sum(axis=1), axis=0) * 100
     
     # Sélection des principales familles
-    top_parties = scrutin_pcts.sum().sort_values(ascending=False).head(6).index
+    top_parties = list(top if top is not None else compute_party_ranking(df))[:6]
     scrutin_pcts_filtered = scrutin_pcts[top_parties]
     
-    plt.figure(figsize=(14, 8))
+    fig = get_figure((14, 8))
     scrutin_pcts_filtered.plot(kind='bar', stacked=False, ax=plt.gca())
     
     plt.title('Répartition des victoires par famille politique et type de scrutin', fontsize=16, pad=20)
@@ -191,8 +275,7 @@ def plot_scrutin_comparison(df, output_dir):
     plt.grid(True, alpha=0.3)
     
     output_path = os.path.join(output_dir, 'comparaison_scrutins.png')
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    plt.close()
+    fig.savefig(output_path, bbox_inches='tight')
     
     return output_path
 
@@ -201,33 +284,34 @@ def plot_socioeconomic_trends(df, output_dir):
     print("📊 Génération: Tendances socio-économiques")
     
     # Vérification des colonnes socio-économiques
-    socio_cols = ['population', 'revenu_median_uc_euros', 'taux_chomage_pct', 
-                  'taux_pauvrete_pct', 'delinquance_pour_1000_hab']
-    available_cols = [col for col in socio_cols if col in df.columns]
+    available_cols = [col for col in SOCIO_COLUMNS if col in df.columns]
     
     if not available_cols:
         print("⚠️  Aucune colonne socio-économique trouvée")
         return None
     
     # Évolution moyenne des indicateurs
-    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    fig = get_figure((16, 12))
+    axes = fig.subplots(2, 2)
     axes = axes.flatten()
     
-    for i, col in enumerate(available_cols[:4]):  # Limite à 4 graphiques
-        if i >= 4:
-            break
-            
-        data = df.groupby('annee')[col].mean().dropna()
-        if len(data) > 1:
-            axes[i].plot(data.index, data.values, marker='o', linewidth=2, markersize=6)
+    # Moyennes annuelles des (au plus) 4 indicateurs en un seul groupby
+    yearly = df.groupby('annee', sort=True)[available_cols[:4]].mean()
+    years = yearly.index.to_numpy(dtype=float)
+    
+    for i, col in enumerate(yearly.columns):  # Limite à 4 graphiques
+        values = yearly[col].to_numpy(dtype=float)
+        valid = ~np.isnan(values)
+        x, y = years[valid], values[valid]
+        if len(y) > 1:
+            axes[i].plot(x, y, marker='o', linewidth=2, markersize=6)
             axes[i].set_title(f'Évolution: {col.replace("_", " ").title()}')
             axes[i].set_xlabel('Année')
             axes[i].grid(True, alpha=0.3)
             
             # Trend line
-            z = np.polyfit(data.index, data.values, 1)
-            p = np.poly1d(z)
-            axes[i].plot(data.index, p(data.index), "r--", alpha=0.7, linewidth=1)
+            z = np.polyfit(x, y, 1)
+            axes[i].plot(x, np.polyval(z, x), "r--", alpha=0.7, linewidth=1)
     
     # Masquer les axes non utilisés
     for i in range(len(available_cols), 4):
@@ -237,8 +321,7 @@ def plot_socioeconomic_trends(df, output_dir):
     plt.tight_layout()
     
     output_path = os.path.join(output_dir, 'tendances_socioeconomiques.png')
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    plt.close()
+    fig.savefig(output_path, bbox_inches='tight')
     
     return output_path
 
@@ -246,22 +329,18 @@ def plot_correlation_matrix(df, output_dir):
     """Matrice de corrélation des variables numériques"""
     print("📊 Génération: Matrice de corrélation")
     
-    # Sélection des variables numériques pertinentes
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-    
-    # Filtrage des colonnes pertinentes (éviter trop de bruit)
-    relevant_cols = [col for col in numeric_cols if any(keyword in col.lower() for keyword in 
-                    ['turnout', 'population', 'revenu', 'chomage', 'pauvrete', 'delinquance', 'pct'])]
+    # Variables pertinentes présentes (liste fixe : éviter trop de bruit)
+    relevant_cols = [col for col in CORRELATION_COLUMNS if col in df.columns]
     
     if len(relevant_cols) < 2:
         print("⚠️  Pas assez de variables numériques pour la corrélation")
         return None
     
     # Calcul de la matrice de corrélation
-    corr_matrix = df[relevant_cols].corr()
+    corr_matrix = df[relevant_cols].corr(numeric_only=True)
     
     # Visualisation
-    plt.figure(figsize=(12, 10))
+    fig = get_figure((12, 10))
     mask = np.triu(np.ones_like(corr_matrix, dtype=bool))  # Masque triangulaire
     
     sns.heatmap(corr_matrix, mask=mask, annot=True, cmap='coolwarm', center=0,
@@ -273,8 +352,7 @@ def plot_correlation_matrix(df, output_dir):
     plt.yticks(rotation=0)
     
     output_path = os.path.join(output_dir, 'matrice_correlation.png')
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    plt.close()
+    fig.savefig(output_path, bbox_inches='tight')
     
     return output_path
 
@@ -287,32 +365,33 @@ def generate_summary_report(df, output_files, output_dir):
         'nb_communes': df['code_commune_insee'].nunique(),
         'nb_elections': len(df),
         'types_scrutin': list(df['type_scrutin'].unique()),
-        'principales_familles': list(df['famille_politique'].value_counts().head(5).index),
+        'principales_familles': list(compute_party_ranking(df, 5)),
         'participation_moyenne': f"{df['turnout_pct'].mean()*100:.1f}%",
         'fichiers_generes': [os.path.basename(f) for f in output_files if f]
     }
     
     # Sauvegarde du rapport JSON
-    import json
     report_path = os.path.join(output_dir, 'rapport_synthese.json')
-    with open(report_path, 'w', encoding='utf-8') as f:
-        json.dump(summary, f, indent=2, ensure_ascii=False)
+    write_json(summary, report_path)
     
-    # Rapport texte lisible
+    # Rapport texte lisible, assemblé puis écrit en une fois
     txt_report_path = os.path.join(output_dir, 'rapport_synthese.txt')
-    with open(txt_report_path, 'w', encoding='utf-8') as f:
-        f.write("=== RAPPORT D'ANALYSE DES TENDANCES ÉLECTORALES ===\n\n")
-        f.write(f"Période analysée: {summary['periode_analysee']}\n")
-        f.write(f"Nombre de communes: {summary['nb_communes']}\n")
-        f.write(f"Nombre d'élections: {summary['nb_elections']}\n")
-        f.write(f"Types de scrutin: {', '.join(summary['types_scrutin'])}\n")
-        f.write(f"Participation moyenne: {summary['participation_moyenne']}\n\n")
-        f.write("Principales familles politiques:\n")
-        for i, famille in enumerate(summary['principales_familles'], 1):
-            f.write(f"  {i}. {famille}\n")
-        f.write(f"\nFichiers générés: {len(summary['fichiers_generes'])} graphiques\n")
-        for fichier in summary['fichiers_generes']:
-            f.write(f"  - {fichier}\n")
+    familles = "".join(f"  {i}. {famille}\n"
+                       for i, famille in enumerate(summary['principales_familles'], 1))
+    fichiers = "".join(f"  - {fichier}\n" for fichier in summary['fichiers_generes'])
+    Path(txt_report_path).write_text(
+        "=== RAPPORT D'ANALYSE DES TENDANCES ÉLECTORALES ===\n\n"
+        f"Période analysée: {summary['periode_analysee']}\n"
+        f"Nombre de communes: {summary['nb_communes']}\n"
+        f"Nombre d'élections: {summary['nb_elections']}\n"
+        f"Types de scrutin: {', '.join(summary['types_scrutin'])}\n"
+        f"Participation moyenne: {summary['participation_moyenne']}\n\n"
+        "Principales familles politiques:\n"
+        f"{familles}"
+        f"\nFichiers générés: {len(summary['fichiers_generes'])} graphiques\n"
+        f"{fichiers}",
+        encoding='utf-8'
+    )
     
     return txt_report_path
 
@@ -326,11 +405,13 @@ def main():
     parser.add_argument("--types", nargs="*", 
                        choices=["evolution", "participation", "scrutins", "socio", "correlation", "all"],
                        default=["all"], help="Types d'analyses à effectuer")
+    parser.add_argument("--dpi", type=int, default=150,
+                       help="Résolution des graphiques PNG exportés (ex. 300 pour publication)")
     
     args = parser.parse_args()
     
     # Configuration
-    setup_matplotlib()
+    setup_matplotlib(args.dpi)
     
     # Création du répertoire de sortie
     os.makedirs(args.output, exist_ok=True)
@@ -343,20 +424,27 @@ def main():
     output_files = []
     analyses = args.types if "all" not in args.types else ["evolution", "participation", "scrutins", "socio", "correlation"]
     
+    # Classement des familles politiques, partagé par les deux graphiques qui l'utilisent
+    top = compute_party_ranking(df) if {"evolution", "scrutins"} & set(analyses) else None
+    
+    # Graphiques tracés l'un après l'autre dans la même figure (voir get_figure)
+    plots = []
     if "evolution" in analyses:
-        output_files.append(plot_party_evolution(df, args.output))
+        plots.append((plot_party_evolution, {'top': top}))
     
     if "participation" in analyses:
-        output_files.append(plot_turnout_evolution(df, args.output))
+        plots.append((plot_turnout_evolution, {}))
     
     if "scrutins" in analyses:
-        output_files.append(plot_scrutin_comparison(df, args.output))
+        plots.append((plot_scrutin_comparison, {'top': top}))
     
     if "socio" in analyses:
-        output_files.append(plot_socioeconomic_trends(df, args.output))
+        plots.append((plot_socioeconomic_trends, {}))
     
     if "correlation" in analyses:
-        output_files.append(plot_correlation_matrix(df, args.output))
+        plots.append((plot_correlation_matrix, {}))
+    
+    output_files = [plot_func(df, args.output, **kwargs) for plot_func, kwargs in plots]
     
     # Rapport de synthèse
     report_file = generate_summary_report(df, output_files, args.output)